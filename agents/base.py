@@ -3,7 +3,9 @@ Base agent class with LLM integration and token counting
 """
 import os
 import json
+import functools
 import logging
+import threading
 import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -12,6 +14,13 @@ import tiktoken
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=32)
+def _parse_prompt(path: str, mtime_ns: int) -> Dict[str, str]:
+    """Parsed YAML prompt template; mtime_ns in the key picks up edits to the file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
 class BaseAgent:
     """Base class for all agents with LLM and token counting"""
 
@@ -22,16 +31,18 @@ class BaseAgent:
         self.token_counter = TokenCounter()
         self.total_tokens = 0
         self.total_cost = 0.0
+        self._usage_lock = threading.Lock()  # calls may run concurrently (workflow fan-out)
     
     def load_prompt(self, prompt_file: str) -> Dict[str, str]:
-        """Load prompt template from YAML file"""
+        """Load prompt template from YAML file (parsed once per file version)"""
         prompt_path = Path("prompts") / prompt_file
-        if not prompt_path.exists():
+        try:
+            mtime = prompt_path.stat().st_mtime_ns
+        except OSError:
             logger.error(f"Prompt file not found: {prompt_path}")
             return {"system": "", "user": ""}
-        
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        # Shallow copy: callers may adjust their template without touching the cache
+        return dict(_parse_prompt(str(prompt_path.resolve()), mtime))
     
     def call_llm(self, messages: List[Dict], temperature: float = 0.3, max_tokens: int = 4096, response_schema: Optional[Dict] = None) -> Tuple[str, int, int]:
         """
@@ -61,11 +72,11 @@ class BaseAgent:
 
         # Update totals
         total = prompt_tokens + completion_tokens
-        self.total_tokens += total
-
         # Estimate cost (rough estimate, adjust based on actual model)
         cost = self._estimate_cost(prompt_tokens, completion_tokens)
-        self.total_cost += cost
+        with self._usage_lock:
+            self.total_tokens += total
+            self.total_cost += cost
 
         logger.info(f"[{self.name}] LLM call: {prompt_tokens} prompt + {completion_tokens} completion = {total} tokens (${cost:.4f})")
 
@@ -1,8 +1,11 @@
 """
 Orchestrator Agent - analyzes paper structure and plans section generation
 """
+import copy
 import logging
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 from agents.base import BaseAgent
 from src.utils.llm_client import LLMClient
 
@@ -12,11 +15,26 @@ logger = logging.getLogger(__name__)
 class OrchestratorAgent(BaseAgent):
     """Agent for paper structure analysis and task planning"""
 
+    # Section plans keyed by (arxiv_id, title), shared across instances in this process;
+    # least-recently-used plans are evicted beyond _ANALYSIS_CACHE_MAX (long-running API server)
+    _ANALYSIS_CACHE_MAX = 128
+    _analysis_cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+    _analysis_cache_lock = threading.Lock()
+
     def __init__(self, llm_client=None, log_callback=None):
         super().__init__("OrchestratorAgent", agent_type="orchestrator")
         # Create own LLM client with orchestrator type for model selection
         self.llm_client = LLMClient(log_callback=log_callback, agent_type="orchestrator") if llm_client is None else llm_client
     
+    @classmethod
+    def _remember_analysis(cls, key: Tuple[str, str], result: Dict) -> None:
+        """Cache a copy of a section plan, evicting the least recently used beyond the limit"""
+        with cls._analysis_cache_lock:
+            cls._analysis_cache[key] = copy.deepcopy(result)
+            cls._analysis_cache.move_to_end(key)
+            while len(cls._analysis_cache) > cls._ANALYSIS_CACHE_MAX:
+                cls._analysis_cache.popitem(last=False)
+
     def analyze_paper(self, paper: Dict, max_retries: int = 3) -> Dict:
         """
         Analyze paper and generate section plan
@@ -33,6 +51,18 @@ class OrchestratorAgent(BaseAgent):
                 "meta": {token counts, etc}
             }
         """
+        # Same paper analyzed earlier in this process: reuse the plan (no LLM tokens spent)
+        key = (paper.get('arxiv_id', ''), paper.get('title', ''))
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(key)
+        if cached is not None:
+            result = copy.deepcopy(cached)
+            result['meta'].update(prompt_tokens=0, completion_tokens=0, total_tokens=0, cached=True)
+            logger.info(f"[OrchestratorAgent] Reusing cached section plan for {key[0] or key[1]}")
+            return result
+
         # Load prompt template
         prompt_template = self.load_prompt("orchestrator.yaml")
         
@@ -116,6 +146,7 @@ class OrchestratorAgent(BaseAgent):
                         }
                     }
                     logger.info(f"[OrchestratorAgent] Generated {len(sections)} sections (attempt {attempt+1})")
+                    self._remember_analysis(key, result)
                     return result
                 
             except Exception as e:
@@ -1,8 +1,9 @@
 """
 A2A Workflow Coordinator - orchestrates multi-agent paper-to-video generation
 """
+import asyncio
 import logging
-from typing import Dict, List, Callable, Optional
+from typing import Any, Callable, Dict, List, Optional
 from agents.orchestrator import OrchestratorAgent
 from agents.script_agent import ScriptAgent
 from agents.slide_agent import SlideAgent
@@ -91,25 +92,25 @@ class A2AWorkflow:
         for attempt in range(max_qa_retries + 1):
             self._log("workflow", f"Generation attempt {attempt + 1}/{max_qa_retries + 1}")
             
-            # Step 3: Script Agent - generate scripts
-            self._log("script_agent", "Step 3: Generating scripts")
-            scripts = []
-            for i, section in enumerate(sections):
-                self._log("script_agent", f"Generating script {i+1}/{len(sections)}: {section['title']}")
-                script = self.script_agent.generate_script(section, paper)
-                scripts.append(script)
+            # Step 3: Script Agent - generate scripts (all sections concurrently)
+            self._log("script_agent", f"Step 3: Generating {len(sections)} scripts concurrently")
+            scripts = self._fan_out([
+                (self.script_agent.generate_script, (section, paper), {})
+                for section in sections
+            ])
+            for i, script in enumerate(scripts):
                 self._update_tokens(script.get('meta', {}))
                 self._log("script_agent", f"Script {i+1} generated: {len(script.get('narration_parts', []))} parts")
             
             self.state['scripts'] = scripts
             
-            # Step 4: Slide Agent - generate slides
-            self._log("slide_agent", "Step 4: Generating slides")
-            slides = []
-            for i, script in enumerate(scripts):
-                self._log("slide_agent", f"Generating slide {i+1}/{len(scripts)}: {script['title']}")
-                slide = self.slide_agent.generate_slide_plan(script, paper, slide_index=i+1)
-                slides.append(slide)
+            # Step 4: Slide Agent - generate slides (all scripts concurrently)
+            self._log("slide_agent", f"Step 4: Generating {len(scripts)} slides concurrently")
+            slides = self._fan_out([
+                (self.slide_agent.generate_slide_plan, (script, paper), {'slide_index': i+1})
+                for i, script in enumerate(scripts)
+            ])
+            for i, slide in enumerate(slides):
                 self._update_tokens(slide.get('meta', {}))
                 self._log("slide_agent", f"Slide {i+1} generated with image: {slide.get('image_path', 'N/A')}")
             
@@ -163,6 +164,24 @@ class A2AWorkflow:
             }
         }
     
+    @staticmethod
+    def _fan_out(calls: List[tuple]) -> List[Any]:
+        """
+        Run independent (blocking) agent calls concurrently and return results in order.
+
+        Each agent call is dominated by LLM/API round-trips, so N sections cost
+        roughly one round-trip instead of N. Exceptions propagate as before.
+
+        Args:
+            calls: [(func, args, kwargs), ...]
+        """
+        async def _gather():
+            return await asyncio.gather(*(
+                asyncio.to_thread(func, *args, **kwargs) for func, args, kwargs in calls
+            ))
+
+        return list(asyncio.run(_gather()))
+
     def _update_tokens(self, meta: Dict):
         """Update token counts from agent meta"""
         tokens = meta.get('total_tokens', 0)
@@ -168,7 +168,8 @@ def _write_text_slide(title: str, bullets: list[str], out: Path, size=(1920,1080
         draw.text((120, y), f"• {str(b)[0:70]}", fill=(220,220,220), font=fb)
         y += 90
     out.parent.mkdir(parents=True, exist_ok=True)
-    img.save(str(out), 'PNG', optimize=True)
+    # 中间帧随后由 ffmpeg 转码：用最快的 zlib 级别，不做 optimize 多遍压缩
+    img.save(str(out), 'PNG', compress_level=1)
 
 
 def _write_slide_with_image(title: str, bullets: list[str], image_path: str | None, out_path: Path, size=(1920,1080)):
@@ -204,7 +205,7 @@ def _write_slide_with_image(title: str, bullets: list[str], image_path: str | No
         y += 80
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    img.save(str(out_path), 'PNG', optimize=True)
+    img.save(str(out_path), 'PNG', compress_level=1)
 
 
 # --- Web-facing minimal pipeline for Generate page (structured logs) ---
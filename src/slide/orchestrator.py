@@ -264,14 +264,21 @@ class SlideOrchestrator:
         # URL 其次
         url = meta.get('pptx_url')
         if isinstance(url, str) and url.startswith('http'):
+            # 流式写入同目录临时文件后原子替换：不在内存中缓存整个 PPTX，中断时也不会留下残缺文件
+            tmp_path = target_path.with_name(target_path.name + ".part")
             try:
+                import os
                 import requests
-                resp = requests.get(url, timeout=120)
-                resp.raise_for_status()
-                with open(target_path, 'wb') as f:
-                    f.write(resp.content)
+                import shutil
+                with requests.get(url, timeout=120, stream=True) as resp:
+                    resp.raise_for_status()
+                    resp.raw.decode_content = True
+                    with open(tmp_path, 'wb') as f:
+                        shutil.copyfileobj(resp.raw, f, length=64 * 1024)
+                os.replace(tmp_path, target_path)
                 logger.info(f"已下载外部PPTX：{target_path}")
             except Exception as e:
+                tmp_path.unlink(missing_ok=True)
                 logger.warning(f"下载外部PPTX失败：{e}")
 
     def _maybe_export_pptx(self, slide_paths: List[str], paper_id: str) -> None:
@@ -355,7 +362,7 @@ class SlideOrchestrator:
                 img = _ig._download_image(rendered_url)
                 if img is not None:
                     img = img.convert('RGB') if img.mode not in ('RGB', 'RGBA') else img
-                    img.save(str(output_path), 'PNG', optimize=True)
+                    img.save(str(output_path), 'PNG', compress_level=1)
                     final_path = str(output_path)
                     self._cache_page(page, paper_ctx, final_path)
                     logger.info(f"使用外部已渲染页面，已保存: {final_path}")
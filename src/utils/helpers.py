@@ -87,16 +87,22 @@ def ensure_dir(directory: str) -> Path:
     return path
 
 
+# 已加载过的 .env 路径（同一进程内重复调用直接返回）
+_LOADED_ENV_FILES = set()
+
+
 def load_env_from_file(filepath: str = ".env") -> None:
     """
     轻量加载 .env 配置到 os.environ（无第三方依赖）
     - 忽略以 # 开头的注释行
-    - 仅解析 KEY=VALUE 形式（不支持引号展开/转义）
+    - 仅解析 KEY=VALUE 形式（去除首尾引号，不支持转义）
+    - 同一文件在进程内只解析一次
     """
     try:
-        p = Path(filepath)
-        if not p.exists():
+        p = Path(filepath).resolve()
+        if p in _LOADED_ENV_FILES or not p.exists():
             return
+        _LOADED_ENV_FILES.add(p)
         with open(p, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.strip()
@@ -106,7 +112,7 @@ def load_env_from_file(filepath: str = ".env") -> None:
                     continue
                 key, val = line.split("=", 1)
                 key = key.strip()
-                val = val.strip()
+                val = val.strip().strip('"').strip("'")
                 if key and val and key not in os.environ:
                     os.environ[key] = val
     except Exception as e:
@@ -1,18 +1,30 @@
 import os
 import json
 import time
+import hashlib
 import logging
 import re
+import threading
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib import request, error
 
 logger = logging.getLogger(__name__)
 
+# 文本清洗用的预编译正则 / 转换表（repair 循环中会被反复调用）
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+_SENTENCE_SPLIT_RE = re.compile(r"[。.!?；;]\s*")
+_NEWLINES_RE = re.compile(r"\n+")
+_ASCII_RUN_RE = re.compile(r"[A-Za-z0-9_/.:;+\-]{3,}")
+_LATIN_RUN_RE = re.compile(r"[A-Za-z]{2,}")
+_CTRL_TABLE = str.maketrans({chr(c): " " for c in [*range(0x20), 0x7f]})
+
 
 class LLMClient:
     """
     Minimal LLM client with Gemini (preferred) and OpenAI compatibility.
-    - chat_completion(messages): returns raw text response
+    - chat_completion(messages): returns raw text response (optional on-disk cache via LLM_CACHE=1)
     - extract_json_from_response(text): best-effort JSON extractor
     - generate_script_sections(paper): structured 6-section script for slides and TTS
     """
@@ -90,8 +102,79 @@ class LLMClient:
             pass
         self._emit_job_log(level, message)
 
+    # --------------------------- Response cache ---------------------------
+    # 进程内共享的命中统计（多个 LLMClient 实例共用同一缓存目录）
+    _cache_hits = 0
+    _cache_misses = 0
+    _cache_lock = threading.Lock()
+
+    @staticmethod
+    def _cache_dir() -> Optional[Path]:
+        """LLM_CACHE=1 时返回缓存目录（LLM_CACHE_DIR，默认 .cache/llm），否则 None"""
+        if os.environ.get("LLM_CACHE", "").strip().lower() not in ("1", "true", "yes"):
+            return None
+        return Path(os.environ.get("LLM_CACHE_DIR", ".cache/llm"))
+
+    def _cache_key(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, response_schema: Optional[Dict]) -> str:
+        # 模型由 agent_type 与各 provider 配置共同决定，一并纳入 key
+        iflow_model = self.iflow_script_model if self.agent_type == "script_agent" else self.iflow_agent_model
+        model = "|".join(str(m) for m in (iflow_model, self.generic_model, self.gemini_model, self.openai_model, self.hf_model))
+        blob = "\n".join([
+            model,
+            json.dumps(messages, sort_keys=True, ensure_ascii=False),
+            repr(float(temperature)),
+            str(int(max_tokens)),
+            json.dumps(response_schema, sort_keys=True) if response_schema else "",
+        ])
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """返回本进程内响应缓存的命中统计：{"hits", "misses", "hit_rate"}"""
+        with cls._cache_lock:
+            hits, misses = cls._cache_hits, cls._cache_misses
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": (hits / total) if total else 0.0}
+
+    @classmethod
+    def _count_cache(cls, hit: bool) -> None:
+        with cls._cache_lock:
+            if hit:
+                cls._cache_hits += 1
+            else:
+                cls._cache_misses += 1
+
     # --------------------------- Core chat ---------------------------
     def chat_completion(self, messages: List[Dict[str, str]], temperature: float = 0.3, max_tokens: int = 2048, response_schema: Optional[Dict] = None) -> str:
+        cache_dir = self._cache_dir()
+        if cache_dir is None:
+            return self._chat_completion_uncached(messages, temperature, max_tokens, response_schema)
+
+        path = cache_dir / f"{self._cache_key(messages, temperature, max_tokens, response_schema)}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = json.load(f)["text"]
+            self._count_cache(True)
+            self._log("info", f"[LLM] cache hit: {path.name}")
+            return text
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self._count_cache(False)
+        text = self._chat_completion_uncached(messages, temperature, max_tokens, response_schema)
+        if text:
+            # 空响应代表所有 provider 失败，不缓存；写入临时文件后 os.replace 保证原子性
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"text": text}, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"LLMClient: failed to write cache entry {path}: {e}")
+        return text
+
+    def _chat_completion_uncached(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, response_schema: Optional[Dict]) -> str:
         # Try providers in order; if one returns empty due to error, cascade to the next
         # Log provider availability and order (no secrets exposed)
         try:
@@ -570,8 +653,8 @@ class LLMClient:
     def _is_chinese_dominant(text: str, threshold: float = 0.7) -> bool:
         if not text:
             return False
-        cjk = sum(1 for ch in text if '\u4e00' <= ch <= '\u9fff')
-        latin = sum(1 for ch in text if ('A' <= ch <= 'Z') or ('a' <= ch <= 'z'))
+        cjk = len(_CJK_RE.findall(text))
+        latin = len(_LATIN_RE.findall(text))
         total = max(1, cjk + latin)
         return (cjk / total) >= threshold
 
@@ -580,7 +663,7 @@ class LLMClient:
         if not text:
             return text
         # split by common sentence boundaries (Chinese + English)
-        parts = re.split(r"[。.!?；;]\s*", text)
+        parts = _SENTENCE_SPLIT_RE.split(text)
         seen, out = set(), []
         for p in parts:
             p = p.strip()
@@ -637,15 +720,15 @@ class LLMClient:
         # Remove mostly-ASCII lines
         # 更严格地过滤含英文的句子：仅保留 ASCII 占比 < 20% 的行
         lines = []
-        for ln in re.split(r"\n+", content):
+        for ln in _NEWLINES_RE.split(content):
             ln = ln.strip()
             if not ln:
                 continue
-            asc = sum(1 for c in ln if c.isascii())
+            asc = len(ln.encode("ascii", "ignore"))
             ratio = asc / max(1, len(ln))
             if ratio < 0.2:
                 # 移除残留的纯英文/符号片段
-                ln = re.sub(r"[A-Za-z0-9_/.:;+\-]{3,}", " ", ln)
+                ln = _ASCII_RUN_RE.sub(" ", ln)
                 lines.append(ln)
         more = ("。".join([ln for ln in lines if ln.strip()]))
         if len(more) < min_len//2:
@@ -666,7 +749,7 @@ class LLMClient:
             out += "。" + filler_paras[_i % len(filler_paras)]
             _i += 1
         # Remove long Latin sequences to enforce Chinese purity
-        out = re.sub(r"[A-Za-z]{2,}", "", out)
+        out = _LATIN_RUN_RE.sub("", out)
         return out[:8000]
 
 
@@ -674,7 +757,7 @@ class LLMClient:
         fixed: List[str] = []
         for p in parts:
             p = (p or "").strip()
-            p = re.sub(r"[\x00-\x1F\x7F]", " ", p)
+            p = p.translate(_CTRL_TABLE)
             p = self._dedup_sentences(p)
             if not self._is_chinese_dominant(p, threshold=0.9) or len(p) < min_len:
                 p = self._expand_to_chinese(p, topic, min_len=min_len)
@@ -5,12 +5,33 @@ import json
 import logging
 import time
 from typing import Optional
-from urllib import request, error
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from PIL import Image, ImageDraw, ImageFont
 
 logger = logging.getLogger(__name__)
 
 
+def _build_session() -> requests.Session:
+    """进程级 keep-alive 会话：复用 TCP/TLS 连接；仅幂等的 GET（图片下载）在 429/5xx 时由适配器重试"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
 class ImageGenerator:
     """
     Minimal image generator used by Orchestrator.
@@ -58,19 +79,12 @@ class ImageGenerator:
             }
 
             data = json.dumps(body).encode("utf-8")
-            req = request.Request(
-                self.image_api_url,
-                data=data,
-                headers=headers,
-                method="POST"
-            )
 
             logger.info(f"调用 ModelScope API 生成图片: {prompt[:50]}...")
 
-            with request.urlopen(req, timeout=60) as resp:
-                raw = resp.read().decode("utf-8", errors="ignore")
-
-            result = json.loads(raw)
+            resp = _SESSION.post(self.image_api_url, data=data, headers=headers, timeout=60)
+            resp.raise_for_status()
+            result = json.loads(resp.content.decode("utf-8", errors="ignore"))
 
             # 解析响应（ModelScope 返回格式: {"data": [{"url": "..."}]}）
             if "data" in result and len(result["data"]) > 0:
@@ -87,8 +101,8 @@ class ImageGenerator:
             logger.warning("ModelScope API 返回格式异常，使用占位图")
             return self.generate_fallback_image(prompt or "tech diagram", title="")
 
-        except error.HTTPError as e:
-            logger.error(f"ModelScope API 调用失败 (HTTP {e.code}): {e.reason}")
+        except requests.HTTPError as e:
+            logger.error(f"ModelScope API 调用失败 (HTTP {e.response.status_code}): {e.response.reason}")
             return self.generate_fallback_image(prompt or "tech diagram", title="")
         except Exception as e:
             logger.error(f"图片生成异常: {e}")
@@ -107,15 +121,15 @@ class ImageGenerator:
 
     def _download_image(self, url: str) -> Optional[Image.Image]:
         try:
-            with request.urlopen(url, timeout=20) as resp:
-                data = resp.read()
-            return Image.open(io.BytesIO(data))
+            resp = _SESSION.get(url, timeout=20)
+            resp.raise_for_status()
+            return Image.open(io.BytesIO(resp.content))
         except Exception:
             return None
 
     def save_temp_image(self, img: Image.Image) -> str:
         path = os.path.join(self.tmp_dir, f"img_{random.randint(10_000, 99_999)}.png")
-        img.save(path, "PNG", optimize=True)
+        img.save(path, "PNG", compress_level=1)
         return path
 
     @staticmethod
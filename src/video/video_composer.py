@@ -1,14 +1,80 @@
 import os
+import shlex
 import subprocess
+import wave
 from typing import List, Callable, Optional
 
 
+# 失败时记录的 ffmpeg stderr 末尾行数
+_STDERR_TAIL_LINES = 20
+
+
+def _run(cmd: List[str], log: Optional[Callable[[str], None]], label: str) -> None:
+    """Run an ffmpeg command, logging it (shell-quoted) and any failure (with the tail of stderr) under ``label``."""
+    if log:
+        log(f"[video] cmd: {shlex.join(cmd)}")
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    except subprocess.CalledProcessError as e:
+        if log:
+            log(f"[video] ERROR {label} ffmpeg failed: {e}")
+            tail = (e.stderr or b"").decode("utf-8", errors="replace").strip().splitlines()[-_STDERR_TAIL_LINES:]
+            if tail:
+                log(f"[video] ffmpeg stderr (last {len(tail)} lines):\n" + "\n".join(tail))
+        raise
+
+
+def _concat_wav_inplace(wavs: List[str], out: str) -> Optional[float]:
+    """
+    Concatenate PCM WAV files in-process without spawning ffmpeg.
+
+    Returns the total duration in seconds, or None if the inputs do not share
+    the same channel count / sample width / sample rate, or are not PCM WAVs the
+    wave module can read (caller falls back to ffmpeg).
+    """
+    try:
+        params = []
+        for w in wavs:
+            with wave.open(w, "rb") as rf:
+                params.append(rf.getparams())
+    except (wave.Error, EOFError):
+        return None
+    first = params[0]
+    if any(
+        (p.nchannels, p.sampwidth, p.framerate, p.comptype)
+        != (first.nchannels, first.sampwidth, first.framerate, first.comptype)
+        for p in params[1:]
+    ):
+        return None
+
+    total_frames = 0
+    try:
+        with wave.open(out, "wb") as wf:
+            wf.setnchannels(first.nchannels)
+            wf.setsampwidth(first.sampwidth)
+            wf.setframerate(first.framerate)
+            for w in wavs:
+                with wave.open(w, "rb") as rf:
+                    while True:
+                        chunk = rf.readframes(65536)
+                        if not chunk:
+                            break
+                        wf.writeframesraw(chunk)
+                total_frames += rf.getnframes()
+    except (wave.Error, EOFError):
+        if os.path.exists(out):
+            os.remove(out)
+        return None
+    return total_frames / float(first.framerate)
+
+
 class VideoComposer:
     """
-    Compose a narrated video by:
-    1) Building a video from slide images with per-slide durations
-    2) Concatenating WAV segments into a single WAV
-    3) Muxing the audio with the video
+    Compose a narrated video with a single ffmpeg invocation:
+    1) Each slide image is a looped still input with its own duration
+    2) Same-format PCM WAV segments are joined in-process into one temporary audio
+       input (deleted after muxing); otherwise each segment is a separate audio input
+    3) A filter graph concatenates the tracks and muxes them into the output
     """
 
     def __init__(self) -> None:
@@ -20,71 +86,67 @@ class VideoComposer:
             if log:
                 log("[video] compose aborted: missing slides or audio")
             return False
-        # 1) Build concat list for images with durations
-        # 优化：增加最小时长到 2.0 秒，避免过短
-        list_file = os.path.join(self.tmp_dir, "slides.txt")
-        with open(list_file, "w") as f:
-            for p, d in zip(slide_paths, durations):
-                f.write(f"file '{os.path.abspath(p)}'\n")
-                f.write(f"duration {max(10.0, float(d))}\n")  # 最小 10.0 秒，保证时长充足
-            # repeat last frame
-            f.write(f"file '{os.path.abspath(slide_paths[-1])}'\n")
-        video_track = os.path.join(self.tmp_dir, "slides_video.mp4")
-        # 优化：使用 libx264 编码器，CRF 18 高质量，preset veryfast
-        cmd_video = [
-            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_file,
-            "-vf", "scale=1920:1080,format=yuv420p",
-            "-c:v", "libx264", "-crf", "14", "-preset", "medium",
-            "-pix_fmt", "yuv420p", "-r", "30",
-            "-movflags", "+faststart",
-            video_track,
+        # 单次 ffmpeg：每页 -loop 1 -t 单图输入 + 每段 WAV 输入，经 filter_complex 拼接后直接封装，
+        # 不再落盘 slides_video.mp4 / audio_all.wav 中间文件
+        slides = list(zip(slide_paths, durations))
+        cmd = ["ffmpeg", "-y"]
+        for i, (p, d) in enumerate(slides):
+            # 最小 10.0 秒，保证时长充足；最后一页额外停留 1 秒（替代旧 concat 列表末尾重复帧的写法）
+            duration = max(10.0, float(d)) + (1.0 if i == len(slides) - 1 else 0.0)
+            cmd += [
+                "-loop", "1", "-framerate", "30",
+                "-t", f"{duration}",
+                "-i", os.path.abspath(p),
+            ]
+        # 同格式 WAV 直接在进程内拼接，省去 ffmpeg 的 concat 滤镜；格式不一致或无法解析时回退滤镜拼接
+        audio_track = None
+        if len(audio_wavs) > 1:
+            stem = os.path.splitext(os.path.basename(out_path))[0]
+            audio_track = os.path.join(self.tmp_dir, f"{stem}_audio.wav")
+            total_audio = _concat_wav_inplace(audio_wavs, audio_track)
+            if total_audio is not None:
+                if log:
+                    log(f"[video] audio concatenated in-process: {total_audio:.2f}s")
+                audio_wavs = [audio_track]
+            else:
+                audio_track = None
+        for a in audio_wavs:
+            cmd += ["-i", os.path.abspath(a)]
+
+        n_video = len(slides)
+        n_audio = len(audio_wavs)
+        filters = [
+            f"[{i}:v]scale=1920:1080,setsar=1,format=yuv420p[v{i}]"
+            for i in range(n_video)
         ]
-        if log:
-            log(f"[video] cmd: {' '.join(cmd_video)}")
-        try:
-            subprocess.run(cmd_video, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            if log:
-                log(f"[video] ERROR slides->video ffmpeg failed: {e}")
-            raise
-
-        # 2) Concat audio wavs (must be same format)
-        audio_list = os.path.join(self.tmp_dir, "audio.txt")
-        with open(audio_list, "w") as f:
-            for a in audio_wavs:
-                f.write(f"file '{os.path.abspath(a)}'\n")
-        audio_track = os.path.join(self.tmp_dir, "audio_all.wav")
-        cmd_audio = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", audio_list, "-c", "copy", audio_track]
-        if log:
-            log(f"[video] cmd: {' '.join(cmd_audio)}")
-        try:
-            subprocess.run(cmd_audio, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            if log:
-                log(f"[video] ERROR audio concat ffmpeg failed: {e}")
-            raise
-
-        # 3) Mux
-        # 优化：移除 -shortest，改用精准时间对齐
-        # 策略：如果音频较短，用 apad 填充静音；如果视频较短，用 tpad 延长最后一帧
-        # 这里简化实现：不使用 -shortest，让 FFmpeg 自动对齐到较长的轨道
-        final_cmd = [
-            "ffmpeg", "-y",
-            "-i", video_track,
-            "-i", audio_track,
-            "-c:v", "copy",
+        filters.append(
+            "".join(f"[v{i}]" for i in range(n_video))
+            + f"concat=n={n_video}:v=1:a=0[v]"
+        )
+        if n_audio > 1:
+            filters.append(
+                "".join(f"[{n_video + j}:a]" for j in range(n_audio))
+                + f"concat=n={n_audio}:v=0:a=1[a]"
+            )
+            audio_map = "[a]"
+        else:
+            audio_map = f"{n_video}:a"
+        # 不使用 -shortest，让视频和音频都完整保留
+        cmd += [
+            "-filter_complex", ";".join(filters),
+            "-map", "[v]", "-map", audio_map,
+            "-c:v", "libx264", "-tune", "stillimage", "-crf", "14", "-preset", "medium",
+            "-pix_fmt", "yuv420p", "-r", "30",
             "-c:a", "aac", "-b:a", "256k",
-            # 移除 -shortest，让视频和音频都完整保留
-            out_path
+            "-movflags", "+faststart",
+            out_path,
         ]
-        if log:
-            log(f"[video] cmd: {' '.join(final_cmd)}")
         try:
-            subprocess.run(final_cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            if log:
-                log(f"[video] ERROR mux ffmpeg failed: {e}")
-            raise
+            _run(cmd, log, "compose")
+        finally:
+            # 拼接出的临时音轨仅供本次封装使用
+            if audio_track and os.path.exists(audio_track):
+                os.remove(audio_track)
         return True
 
 
@@ -116,6 +178,7 @@ def compose_video(
         - 最小 Slide 时长 2.0 秒
         - 使用 libx264 -crf 18 高质量编码
         - 移除 -shortest，避免截断
+        - 单次 FFmpeg 调用（filter_complex 拼接音视频），无中间文件
         - 1920x1080, 30fps, yuv420p, AAC 音频
     """
     composer = VideoComposer()
@@ -9,6 +9,7 @@ import os
 import time
 import subprocess
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -71,45 +72,44 @@ def _find_cjk_font_path() -> str:
 
 def _load_font(size: int, fallback_english: bool = True) -> ImageFont.FreeTypeFont:
     """加载一个尽可能支持中英文字体；找不到则回退英文/默认字体"""
-    font_path = _find_cjk_font_path()
+    font_path = _CJK_FONT_PATH
     if font_path:
         try:
             return ImageFont.truetype(font_path, size)
-        except Exception:
+        except OSError:
             pass
     # 尝试英文通用字体（标题英文也能显示）
     try:
         return ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", size)
-    except Exception:
+    except OSError:
         return ImageFont.load_default()
 
 
+# 模块导入时一次性探测字体，渲染每页 Slide 时直接复用
+_CJK_FONT_PATH = _find_cjk_font_path()
+_TITLE_FONT = _load_font(80)
+_TEXT_FONT = _load_font(50)
+_INFO_FONT = _load_font(28)
+
+
 def _render_simple_slide(title: str, bullets: List[str]) -> Image.Image:
     """使用 PIL 渲染简单的文本 Slide（中文可显示）"""
     img = Image.new("RGB", (1920, 1080), color=(30, 40, 60))
     draw = ImageDraw.Draw(img)
 
-    title_font = _load_font(80)
-    text_font = _load_font(50)
-
     # 绘制标题（保留足够长度，中文可用）
-    draw.text((100, 100), title[:40], fill=(255, 255, 255), font=title_font)
+    draw.text((100, 100), title[:40], fill=(255, 255, 255), font=_TITLE_FONT)
 
     # 绘制要点
     y = 300
     for bullet in bullets[:5]:
         text = f"• {bullet[:50]}"  # 控制长度，避免超出
-        draw.text((150, y), text, fill=(220, 220, 220), font=text_font)
+        draw.text((150, y), text, fill=(220, 220, 220), font=_TEXT_FONT)
         y += 120
 
     # 在左下角打印所用字体（调试用，便于确认中文字体加载成功）
-    try:
-        font_path = _find_cjk_font_path()
-        if font_path:
-            info_font = _load_font(28)
-            draw.text((50, 1000), f"Font: {os.path.basename(font_path)}", fill=(180, 180, 180), font=info_font)
-    except Exception:
-        pass
+    if _CJK_FONT_PATH:
+        draw.text((50, 1000), f"Font: {os.path.basename(_CJK_FONT_PATH)}", fill=(180, 180, 180), font=_INFO_FONT)
 
     return img
 
@@ -203,10 +203,10 @@ def run_demo_mode():
     for i, plan in enumerate(all_plans):
         print(f"  渲染 Slide {i+1}/{len(all_plans)}: {plan.title}")
 
-        # 简化：使用 PIL 生成简单文本 Slide
+        # 简化：使用 PIL 生成简单文本 Slide（存为 JPEG，编码/解码均快于 PNG）
         slide_img = _render_simple_slide(plan.title, plan.bullets or [plan.content or ""])
-        slide_path = str(slide_dir / f"demo_slide_{i+1:03d}.png")
-        slide_img.save(slide_path, "PNG")
+        slide_path = str(slide_dir / f"demo_slide_{i+1:03d}.jpg")
+        slide_img.save(slide_path, "JPEG", quality=95, subsampling=0)
         slide_paths.append(slide_path)
 
     print(f"✓ 渲染完成 {len(slide_paths)} 页 Slide")
@@ -320,13 +320,15 @@ def run_single_mode(paper_id: str):
     # 步骤 5-6: 渲染
     log_step(5, 8, "资源生成与 Slide 渲染")
     slide_paths = []
-    slide_dir = Path("temp/slides")
+    safe_id = str(paper_id).replace('/', '_')
+    # 每篇论文独立子目录，便于 complete 模式多进程并行时互不覆盖
+    slide_dir = Path("temp/slides") / safe_id
     slide_dir.mkdir(parents=True, exist_ok=True)
     for i, plan in enumerate(all_plans):
         print(f"  渲染 Slide {i+1}/{len(all_plans)}: {plan.title}")
         slide_img = _render_simple_slide(plan.title, plan.bullets or [plan.content or ""])
-        slide_path = str(slide_dir / f"single_{paper_id}_slide_{i+1:03d}.png")
-        slide_img.save(slide_path, "PNG")
+        slide_path = str(slide_dir / f"single_{safe_id}_slide_{i+1:03d}.jpg")
+        slide_img.save(slide_path, "JPEG", quality=95, subsampling=0)
         slide_paths.append(slide_path)
     print(f"✓ 渲染完成 {len(slide_paths)} 页 Slide")
 
@@ -348,7 +350,6 @@ def run_single_mode(paper_id: str):
     log_step(8, 8, "视频合成")
     output_dir = Path("output/videos")
     output_dir.mkdir(parents=True, exist_ok=True)
-    safe_id = str(paper_id).replace('/', '_')
     output_path = str(output_dir / f"single_{safe_id}_{int(time.time())}.mp4")
 
     if len(slide_paths) > len(durations):
@@ -388,13 +389,27 @@ def run_complete_mode(max_papers: int):
     for i, paper in enumerate(papers):
         print(f"  {i+1}. {paper.title}")
 
-    # 为每篇论文生成视频
-    all_ok = True
-    for i, paper in enumerate(papers, start=1):
-        print(f"\n--- 处理第 {i}/{len(papers)} 篇 ---")
-        ok = run_single_mode(paper.arxiv_id)
-        all_ok = all_ok and ok
-    return all_ok
+    # 为每篇论文生成视频：各论文的 LLM/TTS/ffmpeg 相互独立，使用多进程并行处理
+    workers = min(len(papers), max(1, (os.cpu_count() or 2) // 2))
+    print(f"\n--- 并行处理 {len(papers)} 篇论文（{workers} 个进程）---")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(run_single_mode, paper.arxiv_id): paper for paper in papers}
+        # 逐篇收集结果：单篇失败只记录并跳过，不影响其他论文已完成的结果
+        for future in as_completed(futures):
+            paper = futures[future]
+            try:
+                results[paper.arxiv_id] = bool(future.result())
+            except Exception as e:
+                print(f"✗ 论文 {paper.arxiv_id} 处理失败，已跳过: {e}")
+                results[paper.arxiv_id] = False
+
+    succeeded = sum(results.values())
+    print(f"\n✓ 完成 {succeeded}/{len(papers)} 篇论文")
+    for arxiv_id, ok in results.items():
+        if not ok:
+            print(f"  ✗ {arxiv_id}")
+    return succeeded == len(papers)
 
 
 def main():
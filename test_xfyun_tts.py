@@ -10,15 +10,21 @@ import sys
 import json
 import base64
 import hmac
-import hashlib
 import time
+import asyncio
 from datetime import datetime
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse
 from wsgiref.handlers import format_date_time
 from time import mktime
-import websocket
+import websockets
 import wave
 
+try:
+    import orjson  # 可选：更快的 JSON 解析（音频帧回调热路径）
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # 从环境变量读取配置
 from dotenv import load_dotenv
 load_dotenv()
@@ -47,39 +53,159 @@ if not all([API_KEY, API_SECRET, APPID]):
     sys.exit(1)
 
 
+# 累积到该长度（base64 字符数）的音频帧后批量解码写盘
+_B64_FLUSH_CHARS = 64 * 1024
+
+
+class XfyunTTSPool:
+    """
+    讯飞 TTS WebSocket 连接池（asyncio）
+    复用已鉴权的连接，避免每次合成都重新进行 TLS 握手 + HMAC 鉴权
+    """
+
+    def __init__(self, url_factory, max_connections=4,
+                 heartbeat=30.0, idle_connection_timeout=120.0, prefetch=True):
+        """
+        Args:
+            url_factory: 生成鉴权 URL 的函数（每次建连重新签名）
+            max_connections: 同时借出的最大连接数
+            heartbeat: 连接的 ping 间隔（秒），由 websockets 内置心跳发送
+            idle_connection_timeout: 空闲超过该时长（秒）的连接在下次借出时回收
+            prefetch: 借出最后一条空闲连接且仍有其它合成在排队时，是否在后台为其预建连接
+        """
+        self._url_factory = url_factory
+        self._slots = asyncio.Semaphore(max_connections)
+        self._max_connections = max_connections
+        self._idle = []  # [(ws, last_used)]
+        self._warming = set()  # 后台建连中的任务
+        self._queued = 0  # 正在等待借出连接的请求数
+        self._closed = False
+        self.prefetch = prefetch
+        self.heartbeat = heartbeat
+        self.idle_connection_timeout = idle_connection_timeout
+
+    @staticmethod
+    def _is_open(ws):
+        return ws.close_code is None
+
+    async def connect(self):
+        """建立一条新的已鉴权连接"""
+        return await websockets.connect(
+            self._url_factory(), ping_interval=self.heartbeat, open_timeout=30
+        )
+
+    def warm_up(self, n=1):
+        """
+        在后台预建 n 条空闲连接（需在事件循环中调用，立即返回）
+        握手与鉴权和调用方的其它工作重叠，首次合成无需等待
+        """
+        for _ in range(min(n, self._max_connections) - len(self._idle) - len(self._warming)):
+            task = asyncio.get_running_loop().create_task(self._warm_one())
+            self._warming.add(task)
+            task.add_done_callback(self._warming.discard)
+
+    async def _warm_one(self):
+        try:
+            ws = await self.connect()
+        except Exception as e:
+            print(f"⚠️  后台预建连接失败: {e}")
+            return
+        if self._closed:
+            await ws.close()
+        else:
+            self._idle.append((ws, time.monotonic()))
+
+    async def _take(self):
+        """取出一条可用连接：空闲连接 > 正在预建的连接 > 新建连接"""
+        while True:
+            now = time.monotonic()
+            while self._idle:
+                ws, last_used = self._idle.pop()
+                if self._is_open(ws) and now - last_used <= self.idle_connection_timeout:
+                    return ws
+                await ws.close()
+            if not self._warming:
+                return await self.connect()
+            # 预建连接已在进行中，等待它完成比重新握手更快
+            await asyncio.wait(set(self._warming), return_when=asyncio.FIRST_COMPLETED)
+
+    async def acquire(self):
+        """借出一条连接（优先复用未超时的空闲连接）"""
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        try:
+            ws = await self._take()
+        except Exception:
+            self._slots.release()
+            raise
+        # 空闲连接已用尽且还有请求在排队：为下一次合成提前建连（单次合成不会多建一条用不上的连接）
+        if self.prefetch and self._queued and not self._idle and not self._closed:
+            self.warm_up()
+        return ws
+
+    async def release(self, ws, reusable=True):
+        """归还连接；不可复用（出错/已断开）的连接直接关闭"""
+        try:
+            if reusable and self._is_open(ws) and not self._closed:
+                self._idle.append((ws, time.monotonic()))
+            else:
+                await ws.close()
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        """关闭连接池及所有空闲连接"""
+        self._closed = True
+        for task in list(self._warming):
+            task.cancel()
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(ws.close() for ws, _ in idle), return_exceptions=True)
+
+
 class XfyunTTS:
-    """讯飞 TTS WebSocket 客户端"""
+    """
+    讯飞 TTS WebSocket 客户端（asyncio）
+    多段文本可通过 synthesize_many 在同一事件循环内并发合成
+    """
     
-    def __init__(self, appid, api_key, api_secret):
+    def __init__(self, appid, api_key, api_secret, pool_size=4):
         self.appid = appid
         self.api_key = api_key
         self.api_secret = api_secret
-        self.ws = None
-        self.audio_data = []
+        # 鉴权所需的常量只计算一次（每次建连都会重新签名）
+        self._hmac_key = api_secret.encode('utf-8')
+        parsed = urlparse(WEBSOCKET_URL)
+        self._host = parsed.netloc
+        self._path = parsed.path
+        # 连接池：借出上限即最大并发合成数
+        self.pool = XfyunTTSPool(self.create_url, max_connections=pool_size)
+        # 在事件循环中构造时，立即在后台建立第一条连接，隐藏首次合成的握手延迟
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            self.pool.warm_up()
         
     def create_url(self):
         """
         生成鉴权 URL
         根据官方文档的鉴权方法
         """
-        # 解析 WebSocket URL
-        url = WEBSOCKET_URL
-        host = "tts-api.xfyun.cn"
-        path = "/v2/tts"
+        host = self._host
         
         # 生成 RFC1123 格式的时间戳
         now = datetime.now()
         date = format_date_time(mktime(now.timetuple()))
         
         # 拼接签名原始字符串
-        signature_origin = f"host: {host}\ndate: {date}\nGET {path} HTTP/1.1"
+        signature_origin = f"host: {host}\ndate: {date}\nGET {self._path} HTTP/1.1"
         
         # 使用 hmac-sha256 算法结合 apiSecret 对 signature_origin 签名
-        signature_sha = hmac.new(
-            self.api_secret.encode('utf-8'),
-            signature_origin.encode('utf-8'),
-            digestmod=hashlib.sha256
-        ).digest()
+        signature_sha = hmac.digest(self._hmac_key, signature_origin.encode('utf-8'), 'sha256')
         
         # base64 编码
         signature = base64.b64encode(signature_sha).decode('utf-8')
@@ -102,90 +228,92 @@ class XfyunTTS:
             "authorization": authorization
         }
         
-        auth_url = f"{url}?{urlencode(params)}"
+        auth_url = f"{WEBSOCKET_URL}?{urlencode(params)}"
         return auth_url
     
-    def on_message(self, ws, message):
-        """接收消息回调"""
+    def handle_frame(self, message, pending):
+        """
+        处理一帧服务端消息，音频的 base64 字符串追加到 pending，由调用方批量解码
+
+        Returns:
+            (done, ok): 是否结束、是否成功
+        """
         try:
-            data = json.loads(message)
+            data = _json_loads(message)
             code = data.get("code")
             
             if code != 0:
                 print(f"❌ 错误: code={code}, message={data.get('message')}")
-                ws.close()
-                return
+                return True, False
             
-            # 提取音频数据
-            audio = data.get("data", {}).get("audio")
-            status = data.get("data", {}).get("status")
+            # 提取音频数据（只取一次 data 字段）
+            frame = data.get("data") or {}
+            audio = frame.get("audio")
+            status = frame.get("status")
             
             if audio:
-                # base64 解码音频数据
-                audio_bytes = base64.b64decode(audio)
-                self.audio_data.append(audio_bytes)
-                print(f"✅ 接收音频数据: {len(audio_bytes)} 字节, status={status}")
+                pending.append(audio)
+                print(f"✅ 接收音频数据: ~{len(audio) * 3 // 4} 字节, status={status}")
             
             # status=2 表示合成结束
             if status == 2:
                 print("✅ 音频合成完成！")
-                ws.close()
+                return True, True
+            return False, True
                 
         except Exception as e:
             print(f"❌ 处理消息时出错: {e}")
-            ws.close()
+            return True, False
     
-    def on_error(self, ws, error):
-        """错误回调"""
-        print(f"❌ WebSocket 错误: {error}")
-    
-    def on_close(self, ws, close_status_code, close_msg):
-        """关闭连接回调"""
-        print(f"🔌 WebSocket 连接已关闭")
-        if close_status_code:
-            print(f"   状态码: {close_status_code}")
-        if close_msg:
-            print(f"   消息: {close_msg}")
-    
-    def on_open(self, ws):
-        """连接建立回调"""
-        print("✅ WebSocket 连接已建立")
-        
-        # 发送合成请求
-        def send_request():
-            # 测试文本
-            text = "这是一个讯飞语音合成测试，用于验证WebSocket API是否正常工作。"
-            
-            # 构建请求参数
-            request_data = {
-                "common": {
-                    "app_id": self.appid
-                },
-                "business": {
-                    "aue": "raw",  # 音频编码: raw (PCM)
-                    "auf": "audio/L16;rate=16000",  # 音频采样率: 16k
-                    "vcn": "xiaoyan",  # 发音人: 小燕（中文女声）
-                    "speed": 50,  # 语速
-                    "volume": 50,  # 音量
-                    "pitch": 50,  # 音高
-                    "tte": "UTF8"  # 文本编码
-                },
-                "data": {
-                    "status": 2,  # 固定为2（一次性传输）
-                    "text": base64.b64encode(text.encode('utf-8')).decode('utf-8')
-                }
+    def build_request(self, text):
+        """构建合成请求参数"""
+        return {
+            "common": {
+                "app_id": self.appid
+            },
+            "business": {
+                "aue": "raw",  # 音频编码: raw (PCM)
+                "auf": "audio/L16;rate=16000",  # 音频采样率: 16k
+                "vcn": "xiaoyan",  # 发音人: 小燕（中文女声）
+                "speed": 50,  # 语速
+                "volume": 50,  # 音量
+                "pitch": 50,  # 音高
+                "tte": "UTF8"  # 文本编码
+            },
+            "data": {
+                "status": 2,  # 固定为2（一次性传输）
+                "text": base64.b64encode(text.encode('utf-8')).decode('utf-8')
             }
-            
-            print(f"📤 发送合成请求:")
-            print(f"   文本: {text}")
-            print(f"   发音人: xiaoyan")
-            print(f"   音频格式: PCM 16k")
-            
-            ws.send(json.dumps(request_data))
-        
-        send_request()
+        }
+    
+    @staticmethod
+    def _flush_audio(pending, wf):
+        """把缓冲的 base64 帧一次性解码写入 WAV；服务端数据为合法 base64，跳过字符校验"""
+        if pending:
+            wf.writeframesraw(base64.b64decode("".join(pending), validate=False))
+            pending.clear()
+
+    async def _run_request(self, ws, payload, wf):
+        """在给定连接上发送请求并接收全部音频帧，返回是否成功"""
+        pending = []  # 待解码的 base64 帧
+        buffered = 0
+        await ws.send(payload)
+        try:
+            while True:
+                n = len(pending)
+                done, ok = self.handle_frame(await ws.recv(), pending)
+                if len(pending) > n:
+                    buffered += len(pending[-1])
+                    # 带 '=' 填充的帧只能作为拼接的最后一段，遇到即解码
+                    if pending[-1].endswith("=") or buffered >= _B64_FLUSH_CHARS:
+                        self._flush_audio(pending, wf)
+                        buffered = 0
+                if done:
+                    return ok
+        finally:
+            self._flush_audio(pending, wf)
     
-    def synthesize(self, text, output_file="test_xfyun_output.wav"):
+    async def synthesize(self, text, output_file="test_xfyun_output.wav"):
         """
         合成语音
         
@@ -193,54 +321,63 @@ class XfyunTTS:
             text: 要合成的文本
             output_file: 输出文件路径
         """
-        # 重置音频数据
-        self.audio_data = []
+        print(f"📤 发送合成请求:")
+        print(f"   文本: {text}")
+        print(f"   发音人: xiaoyan")
+        print(f"   音频格式: PCM 16k")
+        payload = json.dumps(self.build_request(text))
         
-        # 创建鉴权 URL
-        auth_url = self.create_url()
-        print(f"🔗 鉴权 URL 已生成")
-        print()
-        
-        # 创建 WebSocket 连接
-        websocket.enableTrace(False)
-        self.ws = websocket.WebSocketApp(
-            auth_url,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close,
-            on_open=self.on_open
-        )
-        
-        # 运行 WebSocket
-        print("🚀 开始连接 WebSocket...")
-        self.ws.run_forever()
+        # 从连接池借出已鉴权的连接（先借连接再建文件：建连/鉴权失败时不留下只有头部的 WAV）
+        print("🚀 从连接池获取 WebSocket 连接...")
+        ok = False
+        ws = await self.pool.acquire()
+        wf = None
+        try:
+            # 先写好 WAV 头，音频帧边接收边写入（头部长度在 close 时回填）
+            wf = wave.open(output_file, 'wb')
+            wf.setnchannels(1)  # 单声道
+            wf.setsampwidth(2)  # 16-bit
+            wf.setframerate(16000)  # 16kHz
+            try:
+                ok = await self._run_request(ws, payload, wf)
+            except (websockets.ConnectionClosed, OSError):
+                # 复用的连接已被服务端关闭：换一条新连接重试一次
+                if wf.tell():
+                    raise
+                print("🔁 复用连接已断开，重新建立连接...")
+                await ws.close()
+                ws = await self.pool.connect()
+                ok = await self._run_request(ws, payload, wf)
+        except Exception as e:
+            print(f"❌ WebSocket 错误: {e}")
+            ok = False
+        finally:
+            await self.pool.release(ws, reusable=ok)
+            bytes_written = wf.tell() * 2 if wf else 0
+            if wf:
+                wf.close()
         
-        # 保存音频文件
-        if self.audio_data:
+        if bytes_written:
             print()
-            print(f"💾 保存音频文件: {output_file}")
-            
-            # 合并所有音频数据
-            audio_bytes = b''.join(self.audio_data)
-            
-            # 保存为 WAV 文件
-            with wave.open(output_file, 'wb') as wf:
-                wf.setnchannels(1)  # 单声道
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(16000)  # 16kHz
-                wf.writeframes(audio_bytes)
-            
             file_size = os.path.getsize(output_file)
-            print(f"✅ 音频文件已保存: {file_size} 字节")
+            print(f"✅ 音频文件已保存: {output_file} ({bytes_written} 字节音频, 文件 {file_size} 字节)")
             print(f"   文件路径: {os.path.abspath(output_file)}")
             
             return output_file
         else:
             print("❌ 没有接收到音频数据")
+            if os.path.exists(output_file):
+                os.remove(output_file)
             return None
 
+    async def synthesize_many(self, texts, output_files):
+        """并发合成多段文本（并发度受连接池大小限制），结果顺序与输入一致"""
+        return await asyncio.gather(
+            *(self.synthesize(t, f) for t, f in zip(texts, output_files))
+        )
+
 
-def main():
+async def main():
     """主函数"""
     print("开始测试讯飞 TTS WebSocket API...")
     print()
@@ -256,7 +393,10 @@ def main():
     test_text = "这是一个讯飞语音合成测试，用于验证WebSocket API是否正常工作。"
     
     # 合成语音
-    output_file = tts.synthesize(test_text)
+    try:
+        output_file = await tts.synthesize(test_text)
+    finally:
+        await tts.pool.close()
     
     print()
     print("=" * 80)
@@ -270,5 +410,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
-
+    asyncio.run(main())
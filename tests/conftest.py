@@ -0,0 +1,186 @@
+"""
+Shared pytest setup.
+
+The live-API tests are grouped with ``xdist_group`` so they can run alongside
+the offline tests in parallel:
+
+    pytest -n auto --dist=loadgroup tests/
+
+Agent unit tests replay recorded LLM responses from tests/fixtures/ by default;
+set PAPERAUTO_LIVE_LLM=1 to run them against the real providers instead.
+A capture run (PAPERAUTO_CAPTURE=1) calls the real providers once and refreshes
+the fixtures: every chat_completion call is appended to
+tests/fixtures/llm_cache.jsonl keyed by a hash of its arguments, and later runs
+replay by that key (falling back to the per-agent *_response.json).
+Their ``integration``-marked siblings always hit the real APIs and are skipped
+unless PAPERAUTO_INTEGRATION=1.
+Image-provider HTTP traffic in @pytest.mark.vcr tests is recorded into
+tests/cassettes/ only by capture runs and replayed afterwards (requires
+pytest-recording); without a cassette those tests use the local placeholder.
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Make the repo root importable (agents/, graph/, src/, tools/) for every test module
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.utils.helpers import load_env_from_file
+from src.utils.llm_client import LLMClient
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "integration: calls real LLM/image APIs; runs only with PAPERAUTO_INTEGRATION=1"
+    )
+    # Keep the markers known when the optional plugins (pytest-xdist,
+    # pytest-recording) are not installed
+    if not config.pluginmanager.hasplugin("xdist"):
+        config.addinivalue_line(
+            "markers", "xdist_group(name): run tests of the same group on one xdist worker"
+        )
+    if not config.pluginmanager.hasplugin("recording"):
+        config.addinivalue_line(
+            "markers", "vcr: record/replay HTTP traffic via pytest-recording"
+        )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def load_env_once():
+    """Load .env into os.environ once per test session (existing env vars win)."""
+    load_env_from_file()
+
+
+@pytest.fixture(scope="session")
+def llm_client(load_env_once):
+    """One LLMClient shared by the live-LLM tests (built after .env is loaded)."""
+    return LLMClient()
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="session")
+def recorded_llm_responses():
+    """Recorded agent responses, {"script_agent": text, ...}, loaded once per session."""
+    responses = {}
+    for path in FIXTURES_DIR.glob("*_response.json"):
+        with open(path, encoding="utf-8") as f:
+            responses[path.stem[: -len("_response")]] = json.dumps(json.load(f), ensure_ascii=False)
+    return responses
+
+
+LLM_CAPTURE_FILE = FIXTURES_DIR / "llm_cache.jsonl"
+
+
+def _call_key(messages, temperature=0.3, max_tokens=2048, response_schema=None):
+    """Hash of LLMClient.chat_completion arguments, used to match captured calls."""
+    blob = json.dumps(
+        [messages, float(temperature), int(max_tokens), response_schema],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _store_capture(entry: dict) -> None:
+    """Upsert one {"key", "agent", "text"} entry in llm_cache.jsonl (one line per key, latest wins)."""
+    entries = {}
+    if LLM_CAPTURE_FILE.exists():
+        with open(LLM_CAPTURE_FILE, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    old = json.loads(line)
+                    entries[old["key"]] = old
+    entries[entry["key"]] = entry
+    tmp = LLM_CAPTURE_FILE.with_suffix(".jsonl.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for item in entries.values():
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    os.replace(tmp, LLM_CAPTURE_FILE)
+
+
+class RecordReplayLLMClient:
+    """
+    LLMClient proxy for capture runs: forwards chat_completion to a real client,
+    stores {"key", "agent", "text"} in tests/fixtures/llm_cache.jsonl (replacing
+    an earlier capture of the same call, so repeated capture runs do not
+    duplicate entries) and rewrites tests/fixtures/<agent>_response.json with
+    the latest JSON answer.
+    """
+
+    def __init__(self, name: str, client: LLMClient):
+        self.name = name
+        self.client = client
+
+    def chat_completion(self, *args, **kwargs) -> str:
+        text = self.client.chat_completion(*args, **kwargs)
+        if not text:
+            return text
+        _store_capture({"key": _call_key(*args, **kwargs), "agent": self.name, "text": text})
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return text
+        with open(FIXTURES_DIR / f"{self.name}_response.json", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        return text
+
+
+@pytest.fixture(scope="session")
+def captured_llm_calls():
+    """Captured chat_completion responses from llm_cache.jsonl, {call_key: text}."""
+    calls = {}
+    if LLM_CAPTURE_FILE.exists():
+        with open(LLM_CAPTURE_FILE, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    calls[entry["key"]] = entry["text"]
+    return calls
+
+
+@pytest.fixture(scope="session")
+def mock_llm_client(recorded_llm_responses, captured_llm_calls, load_env_once):
+    """
+    Factory for an LLMClient stand-in that replays recorded responses.
+
+    mock_llm_client("script_agent") returns a MagicMock(spec=LLMClient) whose
+    chat_completion returns the captured response for the exact call arguments,
+    or tests/fixtures/script_agent_response.json when the call was not captured.
+    With PAPERAUTO_LIVE_LLM=1 it returns a real LLMClient instead, and with
+    PAPERAUTO_CAPTURE=1 a RecordReplayLLMClient that records real responses.
+    """
+    def _make(name: str):
+        if os.getenv("PAPERAUTO_LIVE_LLM") == "1":
+            return LLMClient()
+        if os.getenv("PAPERAUTO_CAPTURE") == "1":
+            return RecordReplayLLMClient(name, LLMClient())
+        client = MagicMock(spec=LLMClient)
+        client.chat_completion.side_effect = (
+            lambda *args, **kwargs: captured_llm_calls.get(_call_key(*args, **kwargs), recorded_llm_responses[name])
+        )
+        return client
+    return _make
+
+
+@pytest.fixture(scope="module")
+def vcr_config():
+    """pytest-recording: record only in capture runs, otherwise replay (unrecorded requests fail); never store credentials."""
+    return {
+        "record_mode": "all" if os.getenv("PAPERAUTO_CAPTURE") == "1" else "none",
+        "filter_headers": ["authorization", "x-dashscope-api-key"],
+        "filter_query_parameters": ["api_key", "key"],
+    }
+
+
+@pytest.fixture(scope="module")
+def vcr_cassette_dir():
+    return str(Path(__file__).parent / "cassettes")
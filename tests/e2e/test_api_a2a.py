@@ -2,11 +2,14 @@
 End-to-end test for A2A API integration
 """
 import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import pytest
 
 from pathlib import Path
 from src.api_main import run_complete_a2a, OUTPUT_DIR
 
+# Live-API tests share one xdist worker (pytest -n auto --dist=loadgroup)
+pytestmark = pytest.mark.xdist_group("live_llm")
+
 
 def test_api_a2a_integration():
     """Test A2A workflow through API function"""
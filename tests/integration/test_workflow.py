@@ -2,19 +2,19 @@
 Integration test for A2A Workflow
 """
 import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import pytest
 
 from graph.workflow import A2AWorkflow
 from src.utils.llm_client import LLMClient
 
+# Live-API tests share one xdist worker (pytest -n auto --dist=loadgroup)
+pytestmark = pytest.mark.xdist_group("live_llm")
 
-def test_workflow():
+
+def test_workflow(llm_client):
     """Test complete A2A workflow"""
     print("\n=== Testing A2A Workflow ===")
     
-    # Initialize LLM client
-    llm_client = LLMClient()
-    
     # Log callback
     def log_callback(msg):
         agent = msg.get('agent', 'unknown')
@@ -110,7 +110,7 @@ def test_workflow():
 
 if __name__ == '__main__':
     try:
-        test_workflow()
+        test_workflow(LLMClient())
     except Exception as e:
         print(f"\n❌ Workflow integration test FAILED: {e}")
         import traceback
@@ -0,0 +1,450 @@
+"""
+Offline tests for tools.image_gen (no provider keys or network needed)
+"""
+import asyncio
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import tools.image_gen as image_gen
+from tools.image_gen import ImageGenerator
+
+_PROVIDER_ENV = (
+    "DASHSCOPE_API_KEY", "OPENAI_API_KEY", "OPENAI_IMAGE_SIZE", "IMAGE_API_URL", "IMAGE_API_KEY", "IMAGE_MODEL",
+    "IMAGE_LOCAL_MODEL", "IMAGE_SIZE", "IMAGE_FORMAT", "IMAGE_PROVIDER_RACE", "IMAGE_PLACEHOLDER_FALLBACK",
+    "PAPERAUTO_IMAGE_CACHE", "PAPERAUTO_IMAGE_SEMANTIC_CACHE", "PAPERAUTO_IMAGE_SEMANTIC_THRESHOLD",
+)
+
+
+@pytest.fixture(autouse=True)
+def offline_image_env(tmp_path, monkeypatch):
+    """Run from tmp_path with no provider keys or image settings inherited from .env"""
+    monkeypatch.chdir(tmp_path)
+    for name in _PROVIDER_ENV:
+        monkeypatch.delenv(name, raising=False)
+
+
+class FakeProviders:
+    """Provider stand-ins that record their calls and write the prompt (or `content`) as the image"""
+
+    def __init__(self):
+        self.calls = []  # slide ids, in call order
+        self.names = []  # provider names, in call order
+
+    def __call__(self, gen, name="fake", delay=0.0, content=None, fail=False, suffix="png"):
+        def provider(prompt, slide_id, style="professional"):
+            self.calls.append(slide_id)
+            self.names.append(name)
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError(f"All image providers failed for slide {slide_id}: boom")
+            path = gen.output_dir / f"{slide_id}_{name}.{suffix}"
+            path.write_bytes(prompt.encode() if content is None else content)
+            return str(path)
+        provider.__name__ = name
+        return provider
+
+
+@pytest.fixture
+def fake_provider():
+    return FakeProviders()
+
+
+@pytest.fixture
+def bag_of_words(monkeypatch):
+    """Deterministic prompt embeddings for the semantic cache (normalized word counts)"""
+    np = pytest.importorskip("numpy")
+    vocab = ["transformer", "architecture", "diagram", "of", "headshot", "author"]
+
+    def embed(text):
+        vec = np.array([text.split().count(w) for w in vocab], dtype=np.float32)
+        return vec / np.linalg.norm(vec)
+
+    monkeypatch.setattr(image_gen, "_prompt_embedding", embed)
+    monkeypatch.setenv("PAPERAUTO_IMAGE_SEMANTIC_CACHE", "1")
+    return embed
+
+
+def test_generate_images_dedup_calls_provider_once_per_prompt(monkeypatch, fake_provider):
+    # Keep batches on the sync generate_image path patched below (no aiohttp dispatch)
+    monkeypatch.setattr(image_gen, "aiohttp", None)
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "generate_image", fake_provider(gen))
+    items = [("diagram", "s1"), ("headshot", "s2"), ("diagram", "s3"), ("diagram", "s4")]
+    out = gen.generate_images_dedup(items)
+
+    assert sorted(fake_provider.calls) == ["s1", "s2"]
+    assert out[0].endswith("s1_fake.png") and out[1].endswith("s2_fake.png")
+    for path in out[2:]:
+        assert path.endswith(".png")
+        with open(path, "rb") as f:
+            assert f.read() == b"diagram"
+
+
+def test_image_cache_hit_links_slide_file_and_evicts_lru(monkeypatch, fake_provider):
+    monkeypatch.setenv("PAPERAUTO_IMAGE_CACHE_MAX_MB", str(1.5 / 1024))  # 1.5 KB
+    monkeypatch.setenv("IMAGE_FORMAT", "png")  # fake image bytes: skip the WebP transcode
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen, content=b"x" * 1024))
+    gen.generate_image("diagram", "s1")
+    hit = gen.generate_image("diagram", "s2")
+
+    assert fake_provider.calls == ["s1"]
+    assert hit.endswith("s2.png")
+    with open(hit, "rb") as f:
+        assert f.read() == b"x" * 1024
+
+    gen.generate_image("headshot", "s3")
+    assert len(list(gen.cache_dir.iterdir())) == 1
+
+
+def test_semantic_cache_reuses_paraphrased_prompt(monkeypatch, fake_provider, bag_of_words):
+    monkeypatch.setenv("PAPERAUTO_IMAGE_SEMANTIC_THRESHOLD", "0.8")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen))
+    gen.generate_image("architecture diagram of transformer", "s1")
+    reused = gen.generate_image("transformer architecture diagram", "s2")
+    gen.generate_image("author headshot", "s3")
+    gen.generate_image("transformer architecture diagram", "s4", style="academic")
+
+    assert fake_provider.calls == ["s1", "s3", "s4"]
+    with open(reused, "rb") as f:
+        assert f.read() == b"architecture diagram of transformer"
+
+
+def test_semantic_cache_falls_back_to_next_match_when_best_was_evicted(monkeypatch, fake_provider, bag_of_words):
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen))
+    gen.semantic_threshold = 1.01  # seed two similar prompts without them matching each other
+    gen.generate_image("transformer architecture diagram", "s1")
+    gen.generate_image("transformer architecture", "s2")
+    gen.semantic_threshold = 0.7
+    # Evict the closest match (cos 0.87); the runner-up (cos 0.71) still clears the threshold
+    (gen.cache_dir / f"{gen._cache_key('transformer architecture diagram', 'professional')}.png").unlink()
+    reused = gen.generate_image("diagram of transformer architecture", "s3")
+
+    assert fake_provider.calls == ["s1", "s2"]
+    with open(reused, "rb") as f:
+        assert f.read() == b"transformer architecture"
+
+
+def test_semantic_cache_is_per_image_format_and_shared_across_processes(monkeypatch, fake_provider, bag_of_words):
+    monkeypatch.setenv("PAPERAUTO_IMAGE_SEMANTIC_THRESHOLD", "0.8")
+    monkeypatch.setattr(ImageGenerator, "_normalize_image", lambda self, path: path)
+
+    def make_generator(image_format):
+        monkeypatch.setenv("IMAGE_FORMAT", image_format)
+        gen = ImageGenerator()
+        monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen, suffix=image_format))
+        return gen
+
+    webp, other_process = make_generator("webp"), make_generator("webp")
+    with webp._semantic_lock:
+        webp._load_semantic_index()  # index loaded (empty) before the other process writes
+    other_process.generate_image("architecture diagram of transformer", "s1")
+    assert webp.generate_image("transformer architecture diagram", "s2").endswith(".webp")
+    assert fake_provider.calls == ["s1"]
+
+    assert make_generator("png").generate_image("transformer architecture diagram", "s3").endswith(".png")
+    assert fake_provider.calls == ["s1", "s3"]
+
+
+def test_concurrent_identical_requests_share_one_generation(monkeypatch, fake_provider):
+    monkeypatch.setenv("PAPERAUTO_IMAGE_CACHE", "off")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen, delay=0.2))
+    results = {}
+    threads = [
+        threading.Thread(target=lambda sid=sid: results.__setitem__(sid, gen.generate_image("diagram", sid)))
+        for sid in ("s1", "s2", "s3")
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(fake_provider.calls) == 1
+    assert len(set(results.values())) == 3
+    for path in results.values():
+        with open(path, "rb") as f:
+            assert f.read() == b"diagram"
+
+
+def test_placeholder_fallback_only_used_when_providers_fail(monkeypatch, fake_provider):
+    pytest.importorskip("PIL")
+    monkeypatch.setenv("PAPERAUTO_IMAGE_CACHE", "off")
+    monkeypatch.setenv("IMAGE_PLACEHOLDER_FALLBACK", "1")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen, fail=True))
+    out = gen.generate_image("diagram", "s1")
+    assert out.endswith("s1_placeholder.png") and os.path.exists(out)
+
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen))
+    out = gen.generate_image("diagram", "s2")
+    assert out.endswith("s2_fake.png")
+    # A placeholder that already started is deleted in the background once written
+    deadline = time.monotonic() + 5
+    while (gen.output_dir / "s2_placeholder.png").exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not (gen.output_dir / "s2_placeholder.png").exists()
+
+
+def test_generate_images_batch_async_keeps_order_and_maps_failures(monkeypatch, fake_provider):
+    gen = ImageGenerator()
+    working = fake_provider(gen)
+
+    def fake_generate(prompt, slide_id, style="professional"):
+        if prompt == "broken":
+            raise RuntimeError("All image providers failed")
+        return working(prompt, slide_id, style)
+
+    async def fake_generate_async(prompt, slide_id, style="professional", session=None):
+        return fake_generate(prompt, slide_id, style)
+
+    monkeypatch.setattr(gen, "generate_image", fake_generate)
+    monkeypatch.setattr(gen, "generate_image_async", fake_generate_async)
+    out = asyncio.run(gen.generate_images_batch_async(["a", "broken", "c"], ["s1", "s2", "s3"]))
+
+    assert out[0].endswith("s1_fake.png")
+    assert out[1] is None
+    assert out[2].endswith("s3_fake.png")
+
+
+def test_retry_delay_backs_off_with_jitter_and_honours_retry_after():
+    from tools.image_gen import _TransientHTTPError, _retry_delay, _RETRY_CAP, _RETRY_JITTER
+
+    for attempt in range(8):
+        expected = min(_RETRY_CAP, 2 ** attempt)
+        assert expected <= _retry_delay(attempt) <= expected + _RETRY_JITTER
+    throttled = _TransientHTTPError("HTTP 429", {"Retry-After": "12"})
+    assert _retry_delay(0, throttled) == 12.0
+    dated = _TransientHTTPError("HTTP 503", {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert _retry_delay(0, dated) <= 1 + _RETRY_JITTER
+
+
+def test_hedged_race_starts_backup_only_when_primary_is_slow(monkeypatch, fake_provider):
+    monkeypatch.setenv("IMAGE_PROVIDER_RACE", "hedge")
+    monkeypatch.setenv("IMAGE_PROVIDER_HEDGE_DELAY", "0.2")
+    gen = ImageGenerator()
+    gen._hedge = True
+
+    fast_primary = [fake_provider(gen, "primary"), fake_provider(gen, "backup")]
+    assert gen._race_providers(fast_primary, "diagram", "s1", "professional").endswith("s1_primary.png")
+    assert fake_provider.names == ["primary"]
+
+    fake_provider.names.clear()
+    slow_primary = [fake_provider(gen, "primary", delay=1.0), fake_provider(gen, "backup")]
+    assert gen._race_providers(slow_primary, "diagram", "s2", "professional").endswith("s2_backup.png")
+    assert fake_provider.names == ["primary", "backup"]
+
+
+def test_async_request_joins_in_flight_sync_generation(monkeypatch, fake_provider):
+    pytest.importorskip("aiohttp")
+    monkeypatch.setenv("PAPERAUTO_IMAGE_CACHE", "off")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+
+    async def unexpected_async(*args):
+        raise AssertionError("async request should share the in-flight sync generation")
+
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen, delay=0.3))
+    monkeypatch.setattr(gen, "_generate_uncached_async", unexpected_async)
+    worker = threading.Thread(target=gen.generate_image, args=("diagram", "s1"))
+    worker.start()
+    time.sleep(0.1)
+    out = asyncio.run(gen.generate_image_async("diagram", "s2", session=object()))
+    worker.join()
+
+    assert fake_provider.calls == ["s1"]
+    assert out.endswith("s2.png")
+
+
+def test_generate_image_variants_batches_dashscope_requests(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "k")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    requested = []
+
+    class FakeImageSynthesis:
+        @staticmethod
+        def call(api_key, model, prompt, n, size):
+            requested.append(n)
+            results = [SimpleNamespace(url=f"https://img/{len(requested)}/{i}") for i in range(n)]
+            return SimpleNamespace(status_code=200, output=SimpleNamespace(results=results))
+
+    monkeypatch.setattr(image_gen, "_dashscope", lambda: (None, FakeImageSynthesis))
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_download_image", lambda url, path: path.write_bytes(url.encode()))
+
+    slide_ids = [f"s{i}" for i in range(6)]
+    out = gen.generate_image_variants("diagram", slide_ids)
+
+    assert requested == [4, 2]
+    contents = []
+    for path in out:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    assert len(set(contents)) == 6
+
+
+def test_cache_lock_waits_for_other_process_and_reuses_its_image(monkeypatch):
+    fcntl = pytest.importorskip("fcntl")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    gen = ImageGenerator()
+    calls = []
+    monkeypatch.setattr(gen, "_generate_uncached", lambda *args: calls.append(args))
+
+    # Simulate another worker process holding the key's lock while it generates
+    key = gen._cache_key("diagram", "professional")
+    lock_path = gen._lock_dir / f"{key}.lock"
+    lock_path.parent.mkdir(parents=True)
+    gen.cache_dir.mkdir(parents=True)
+    other = open(lock_path, "a")
+    fcntl.flock(other, fcntl.LOCK_EX)
+
+    results = {}
+    worker = threading.Thread(target=lambda: results.__setitem__("s1", gen.generate_image("diagram", "s1")))
+    worker.start()
+    time.sleep(0.2)
+    assert worker.is_alive()
+    (gen.cache_dir / f"{key}.png").write_bytes(b"from other process")
+    other.close()
+    worker.join(5)
+
+    assert calls == []
+    with open(results["s1"], "rb") as f:
+        assert f.read() == b"from other process"
+
+
+def test_cache_lock_failure_falls_back_and_never_strands_waiters(monkeypatch, fake_provider):
+    pytest.importorskip("fcntl")
+    gen = ImageGenerator()
+
+    def flock_unavailable(fd, op):
+        raise OSError(37, "No locks available")
+
+    monkeypatch.setattr(image_gen.fcntl, "flock", flock_unavailable)
+    monkeypatch.setattr(gen, "_generate_uncached", fake_provider(gen))
+    assert gen.generate_image("diagram", "s1").endswith(".png")
+
+    def interrupted(fd, op):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(image_gen.fcntl, "flock", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        gen.generate_image("another diagram", "s2")
+    assert gen._inflight == {}
+
+
+def test_local_diffusers_provider_runs_first_when_configured(monkeypatch):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    monkeypatch.setenv("IMAGE_LOCAL_MODEL", "fake/sd")
+    monkeypatch.setenv("IMAGE_FORMAT", "png")
+    prompts = []
+
+    def fake_pipe(prompt, **kwargs):
+        prompts.append(prompt)
+        return SimpleNamespace(images=[Image.new("RGB", (8, 8))])
+
+    monkeypatch.setattr(image_gen, "_diffusers_pipeline", lambda model: fake_pipe)
+    gen = ImageGenerator()
+
+    assert gen._providers[0].__name__ == "_generate_with_diffusers"
+    assert "local:fake/sd" in gen._signature
+    out = gen.generate_image("diagram", "s1")
+    assert out.endswith("s1_local.png") and os.path.exists(out)
+    assert prompts == [gen._enhance_prompt("diagram", "professional")]
+
+
+def test_image_size_reaches_provider_and_separates_cache_entries(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "k")
+    monkeypatch.setenv("IMAGE_SIZE", "768x768")
+    sizes = []
+
+    class FakeImageSynthesis:
+        @staticmethod
+        def call(api_key, model, prompt, n, size):
+            sizes.append(size)
+            return SimpleNamespace(status_code=200, output=SimpleNamespace(results=[SimpleNamespace(url="u")]))
+
+    monkeypatch.setattr(image_gen, "_dashscope", lambda: (None, FakeImageSynthesis))
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_download_image", lambda url, path: path.write_bytes(b"img"))
+    gen._generate_with_dashscope("diagram", "s1", "professional")
+
+    # wanx-v1 only accepts fixed sizes: 768x768 maps to the nearest square one
+    assert sizes == ["1024*1024"]
+    assert gen._cache_key("diagram", "professional") != ImageGenerator(size=(1024, 1024))._cache_key(
+        "diagram", "professional")
+
+
+def test_image_size_is_validated_and_mapped_per_provider(monkeypatch):
+    for bad in ("1024-1024", "big", "0x0", "100000x1024"):
+        monkeypatch.setenv("IMAGE_SIZE", bad)
+        assert ImageGenerator().image_size == (1024, 1024)
+
+    monkeypatch.setenv("IMAGE_SIZE", "1280*720")
+    gen = ImageGenerator()
+    assert gen.image_size == (1280, 720)
+    assert gen._dashscope_size == "1280*720"
+    assert gen._openai_size_for("dall-e-3") == "1792x1024"
+    assert gen._openai_size_for("gpt-image-1") == "1536x1024"
+    assert gen._openai_size_for("my-compatible-model") == "1280x720"
+
+
+def test_expired_result_url_is_not_retried(monkeypatch):
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "k")
+    requests_made = []
+
+    class FakeImageSynthesis:
+        @staticmethod
+        def call(**kwargs):
+            requests_made.append(kwargs)
+            return SimpleNamespace(status_code=200, output=SimpleNamespace(results=[SimpleNamespace(url="u")]))
+
+    def expired(url, path):
+        raise image_gen._ExpiredURLError("Image URL expired (HTTP 403): u")
+
+    monkeypatch.setattr(image_gen, "_dashscope", lambda: (None, FakeImageSynthesis))
+    monkeypatch.setattr(image_gen.time, "sleep", lambda s: pytest.fail("should not back off"))
+    gen = ImageGenerator()
+    monkeypatch.setattr(gen, "_download_image", expired)
+
+    assert gen._generate_with_dashscope("diagram", "s1", "professional") is None
+    assert len(requests_made) == 1
+
+
+def test_race_never_overlaps_shared_keys_and_drops_loser_files(fake_provider):
+    gen = ImageGenerator()
+    gen._race, gen._hedge = True, False
+
+    providers = [fake_provider(gen, "_generate_with_dalle", delay=0.1),
+                 fake_provider(gen, "_generate_with_openai_rest"),
+                 fake_provider(gen, "_generate_with_modelscope", delay=0.4)]
+    assert gen._race_providers(providers, "diagram", "s1", "professional").endswith("s1__generate_with_dalle.png")
+    assert sorted(fake_provider.names) == ["_generate_with_dalle", "_generate_with_modelscope"]
+    time.sleep(0.6)
+    assert not (gen.output_dir / "s1__generate_with_modelscope.png").exists()
+
+    fake_provider.names.clear()
+    providers[0] = fake_provider(gen, "_generate_with_dalle", fail=True)
+    assert gen._race_providers(providers, "diagram", "s2", "professional").endswith("s2__generate_with_openai_rest.png")
+    names = fake_provider.names
+    assert names.index("_generate_with_openai_rest") > names.index("_generate_with_dalle")
+
+
+def test_provider_race_is_opt_in(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "k")
+    assert ImageGenerator()._race is False
+    monkeypatch.setenv("IMAGE_PROVIDER_RACE", "hedge")
+    assert ImageGenerator()._hedge is True
@@ -0,0 +1,38 @@
+from src.utils.llm_client import LLMClient
+
+
+def test_chat_completion_cache_hits_on_repeat(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+
+    calls = []
+
+    def fake_uncached(self, messages, temperature, max_tokens, response_schema):
+        calls.append(messages)
+        return "缓存响应"
+
+    monkeypatch.setattr(LLMClient, "_chat_completion_uncached", fake_uncached)
+    client = LLMClient()
+    before = LLMClient.cache_stats()
+
+    messages = [{"role": "user", "content": "Attention Is All You Need"}]
+    assert client.chat_completion(messages) == "缓存响应"
+    assert client.chat_completion(messages) == "缓存响应"
+    # 不同参数不命中
+    assert client.chat_completion(messages, temperature=0.9) == "缓存响应"
+
+    after = LLMClient.cache_stats()
+    assert len(calls) == 2
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_chat_completion_cache_disabled_by_default(monkeypatch, tmp_path):
+    monkeypatch.delenv("LLM_CACHE", raising=False)
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(LLMClient, "_chat_completion_uncached", lambda self, *a: "ok")
+
+    LLMClient().chat_completion([{"role": "user", "content": "hi"}])
+
+    assert not list(tmp_path.iterdir())
@@ -1,24 +1,7 @@
 import os
 import pytest
-from src.utils.llm_client import LLMClient
-
-# Load .env manually to make keys available in test env
-try:
-    from pathlib import Path
-    env_path = Path('.env')
-    if env_path.exists():
-        for line in env_path.read_text(encoding='utf-8', errors='ignore').splitlines():
-            line = line.strip()
-            if not line or line.startswith('#') or '=' not in line:
-                continue
-            k, v = line.split('=', 1)
-            k = k.strip(); v = v.strip().strip('"').strip("'")
-            if k and v and k not in os.environ:
-                os.environ[k] = v
-except Exception:
-    pass
-
-pytestmark = pytest.mark.timeout(60)
+
+pytestmark = [pytest.mark.timeout(60), pytest.mark.xdist_group("live_llm")]
 
 
 def _has_any_llm_key():
@@ -29,23 +12,21 @@ def _has_any_llm_key():
     ])
 
 
-def test_llm_chat_completion_returns_text_when_keys_present():
+def test_llm_chat_completion_returns_text_when_keys_present(llm_client):
     if not _has_any_llm_key():
         pytest.skip("No LLM keys in env")
-    client = LLMClient()
-    txt = client.chat_completion([
+    txt = llm_client.chat_completion([
         {"role":"system","content":"用中文回答，尽量简短。"},
         {"role":"user","content":"用两句话概述Transformer是什么。"}
     ], temperature=0.2, max_tokens=256)
     assert isinstance(txt, str) and len(txt.strip()) > 10
 
 
-def test_generate_script_sections_produces_structured_sections():
+def test_generate_script_sections_produces_structured_sections(llm_client):
     if not _has_any_llm_key():
         pytest.skip("No LLM keys in env")
-    client = LLMClient()
     paper = {"title":"A Study on Transformers","abstract":"We investigate ...", "authors":["A","B"], "arxiv_id":"1234.5678"}
-    sections = client.generate_script_sections(paper, n_sections=3)
+    sections = llm_client.generate_script_sections(paper, n_sections=3)
     assert isinstance(sections, list) and len(sections) >= 1
     # no heuristic fallback allowed when keys exist: bullets should come from LLM JSON path
     assert any(len(s.get("bullets", [])) >= 3 for s in sections)
@@ -2,12 +2,33 @@ import os
 import re
 import pytest
 
+try:
+    import numpy as np
+except ImportError:  # numpy is not in requirements.txt
+    np = None
+
 from src.utils.llm_client import LLMClient
 
 
 def zh_ratio(s: str) -> float:
-    ch = sum(1 for c in s if '\u4e00' <= c <= '\u9fff')
-    latin = sum(1 for c in s if ('A' <= c <= 'Z') or ('a' <= c <= 'z'))
+    if np is None:
+        return _zh_ratio_py(s)
+    # Vectorized range checks over a UTF-32 code point view instead of a per-char Python loop
+    cp = np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
+    ch = int(((cp >= 0x4e00) & (cp <= 0x9fff)).sum())
+    latin = int((((cp >= 0x41) & (cp <= 0x5a)) | ((cp >= 0x61) & (cp <= 0x7a))).sum())
+    return ch / max(1, ch + latin)
+
+
+def _zh_ratio_py(s: str, _lo=0x4e00, _hi=0x9fff, _A=0x41, _Z=0x5a, _a=0x61, _z=0x7a) -> float:
+    # Pure-Python fallback: one ord() per char, range bounds bound as locals via defaults
+    ch = latin = 0
+    for c in s:
+        o = ord(c)
+        if _lo <= o <= _hi:
+            ch += 1
+        elif _A <= o <= _Z or _a <= o <= _z:
+            latin += 1
     return ch / max(1, ch + latin)
 
 
@@ -2,19 +2,19 @@
 Unit tests for Orchestrator Agent
 """
 import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import pytest
 
 from agents.orchestrator import OrchestratorAgent
 from src.utils.llm_client import LLMClient
 
+# Live-API tests share one xdist worker (pytest -n auto --dist=loadgroup)
+pytestmark = pytest.mark.xdist_group("live_llm")
 
-def test_orchestrator_with_real_llm():
+
+def test_orchestrator_with_real_llm(llm_client):
     """Test Orchestrator with real LLM"""
     print("\n=== Testing Orchestrator Agent ===")
     
-    # Initialize LLM client
-    llm_client = LLMClient()
-    
     # Initialize Orchestrator
     orchestrator = OrchestratorAgent(llm_client)
     
@@ -53,9 +53,23 @@ def test_orchestrator_with_real_llm():
     return True
 
 
+def test_analysis_cache_evicts_least_recently_used(monkeypatch):
+    from collections import OrderedDict
+
+    monkeypatch.setattr(OrchestratorAgent, "_analysis_cache", OrderedDict())
+    monkeypatch.setattr(OrchestratorAgent, "_ANALYSIS_CACHE_MAX", 2)
+    plan = {"sections": [], "meta": {}}
+    OrchestratorAgent._remember_analysis(("a", ""), plan)
+    OrchestratorAgent._remember_analysis(("b", ""), plan)
+    OrchestratorAgent._analysis_cache.move_to_end(("a", ""))  # "a" was read again
+    OrchestratorAgent._remember_analysis(("c", ""), plan)
+
+    assert list(OrchestratorAgent._analysis_cache) == [("a", ""), ("c", "")]
+
+
 if __name__ == '__main__':
     try:
-        test_orchestrator_with_real_llm()
+        test_orchestrator_with_real_llm(LLMClient())
         print("\n✅ Orchestrator Agent test PASSED")
     except Exception as e:
         print(f"\n❌ Orchestrator Agent test FAILED: {e}")
@@ -2,42 +2,46 @@
 Unit tests for QA Agent
 """
 import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import pytest
 
 from agents.qa_agent import QAAgent
 
+# ~600-char narration parts, built once at import
+_INTRO_PART1 = '这是第一段旁白，内容详细且充实。' * 50
+_INTRO_PART2 = '这是第二段旁白，同样详细且充实。' * 50
+_METHOD_PART1 = '方法部分的第一段旁白，描述核心算法。' * 50
+_METHOD_PART2 = '方法部分的第二段旁白，描述实现细节。' * 50
+_RESULTS_PART1 = '结果部分的第一段旁白，展示实验数据。' * 50
+_RESULTS_PART2 = '结果部分的第二段旁白，分析性能表现。' * 50
 
-def test_qa_agent():
-    """Test QA Agent with sample data"""
-    print("\n=== Testing QA Agent ===")
-    
-    # Initialize QA Agent
-    qa_agent = QAAgent()
-    
+
+@pytest.fixture(scope="session")
+def qa_fixtures():
+    """Sample scripts/slides shared by all QA cases (built once per session)"""
     # Test scripts (good quality)
     good_scripts = [
         {
             'title': 'Introduction',
             'bullets': ['Point 1', 'Point 2', 'Point 3'],
             'narration_parts': [
-                '这是第一段旁白，内容详细且充实。' * 50,  # ~600 chars
-                '这是第二段旁白，同样详细且充实。' * 50   # ~600 chars
+                _INTRO_PART1,
+                _INTRO_PART2
             ]
         },
         {
             'title': 'Method',
             'bullets': ['Method 1', 'Method 2', 'Method 3', 'Method 4'],
             'narration_parts': [
-                '方法部分的第一段旁白，描述核心算法。' * 50,
-                '方法部分的第二段旁白，描述实现细节。' * 50
+                _METHOD_PART1,
+                _METHOD_PART2
             ]
         },
         {
             'title': 'Results',
             'bullets': ['Result 1', 'Result 2', 'Result 3', 'Result 4', 'Result 5'],
             'narration_parts': [
-                '结果部分的第一段旁白，展示实验数据。' * 50,
-                '结果部分的第二段旁白，分析性能表现。' * 50
+                _RESULTS_PART1,
+                _RESULTS_PART2
             ]
         }
     ]
@@ -61,38 +65,7 @@ def test_qa_agent():
         }
     ]
     
-    # Check scripts quality
-    scripts_passed, scripts_issues = qa_agent.check_scripts_quality(good_scripts)
-    print(f"✓ Scripts quality check: {'PASSED' if scripts_passed else 'FAILED'}")
-    if scripts_issues:
-        for issue in scripts_issues:
-            print(f"  - {issue}")
-    else:
-        print("  No issues found")
-    
-    # Check slides quality
-    slides_passed, slides_issues = qa_agent.check_slides_quality(good_slides)
-    print(f"✓ Slides quality check: {'PASSED' if slides_passed else 'FAILED'}")
-    if slides_issues:
-        for issue in slides_issues:
-            print(f"  - {issue}")
-    else:
-        print("  No issues found")
-    
-    # Generate quality report
-    report = qa_agent.generate_quality_report(good_scripts, good_slides)
-    print(f"\n✓ Quality Report:")
-    print(f"  Overall: {'PASSED' if report['overall_passed'] else 'FAILED'}")
-    print(f"  Scripts: {report['stats']['num_scripts']}")
-    print(f"  Slides: {report['stats']['num_slides']}")
-    print(f"  Total narration: {report['stats']['total_narration_chars']} chars")
-    print(f"  Avg narration: {report['stats']['avg_narration_chars']} chars")
-    print(f"  Total bullets: {report['stats']['total_bullets']}")
-    print(f"  Images generated: {report['stats']['images_generated']}")
-    print(f"  Repetition rate: {report['stats']['repetition_rate']:.2%}")
-    
-    # Test with bad data
-    print(f"\n=== Testing with bad data ===")
+    # Test scripts (bad quality)
     bad_scripts = [
         {
             'title': 'Bad Script',
@@ -104,26 +77,82 @@ def test_qa_agent():
         }
     ]
     
-    bad_passed, bad_issues = qa_agent.check_scripts_quality(bad_scripts)
-    print(f"✓ Bad scripts detected: {len(bad_issues)} issues")
-    for issue in bad_issues:
+    return {
+        'good_scripts': good_scripts,
+        'good_slides': good_slides,
+        'bad_scripts': bad_scripts,
+    }
+
+
+@pytest.fixture(scope="session")
+def qa_agent():
+    return QAAgent()
+
+
+@pytest.mark.parametrize("case, expect_script_issues", [("good", False), ("bad", True)])
+def test_scripts_quality(qa_agent, qa_fixtures, case, expect_script_issues):
+    """Per-script checks (length, Chinese ratio, bullets) flag only the bad scripts"""
+    passed, issues = qa_agent.check_scripts_quality(qa_fixtures[f"{case}_scripts"])
+    print(f"\n✓ Scripts quality check [{case}]: {'PASSED' if passed else 'FAILED'}")
+    for issue in issues:
         print(f"  - {issue}")
     
-    assert not bad_passed, "Bad scripts should not pass"
-    assert len(bad_issues) >= 3, f"Should detect at least 3 issues, got {len(bad_issues)}"
-    
-    print(f"\n✓ QA Agent correctly identifies quality issues")
-    
-    return True
+    # Cross-section issues (e.g. repetition) are reported without a "Script N" prefix
+    script_issues = [i for i in issues if i.startswith("Script ")]
+    if expect_script_issues:
+        assert not passed, "Bad scripts should not pass"
+        assert len(script_issues) >= 3, f"Should detect at least 3 issues, got {len(script_issues)}"
+    else:
+        assert not script_issues, f"Good scripts should have no per-script issues: {script_issues}"
 
 
-if __name__ == '__main__':
-    try:
-        test_qa_agent()
-        print("\n✅ QA Agent test PASSED")
-    except Exception as e:
-        print(f"\n❌ QA Agent test FAILED: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+def _with_defect(**overrides):
+    """A script that passes every per-script check except the overridden field"""
+    script = {
+        'title': 'Defect',
+        'bullets': ['Point 1', 'Point 2', 'Point 3'],
+        'narration_parts': [_INTRO_PART1, _INTRO_PART2],
+    }
+    script.update(overrides)
+    return script
+
+
+@pytest.mark.parametrize("defect, script, expected_issue_substr", [
+    ("too_few_bullets", _with_defect(bullets=['Only one']), "Less than 3 bullets"),
+    ("too_many_bullets", _with_defect(bullets=[f'Point {i}' for i in range(6)]), "More than 5 bullets"),
+    ("too_short", _with_defect(narration_parts=[_INTRO_PART1, '太短了。' * 20]), "Too short"),
+    ("missing_part", _with_defect(narration_parts=[_INTRO_PART1]), "Less than 2 narration parts"),
+    ("low_chinese_ratio", _with_defect(narration_parts=[_INTRO_PART1, 'English only narration. ' * 30]), "Low Chinese ratio"),
+])
+def test_qa_detects_defect(qa_agent, defect, script, expected_issue_substr):
+    """Each per-script check fires on its own defect"""
+    passed, issues = qa_agent.check_scripts_quality([script])
+    assert not passed, f"{defect} should fail"
+    assert any(expected_issue_substr in i for i in issues), f"{defect}: expected '{expected_issue_substr}' in {issues}"
+
 
+def test_slides_quality(qa_agent, qa_fixtures):
+    slides_passed, slides_issues = qa_agent.check_slides_quality(qa_fixtures['good_slides'])
+    print(f"\n✓ Slides quality check: {'PASSED' if slides_passed else 'FAILED'}")
+    for issue in slides_issues:
+        print(f"  - {issue}")
+    assert slides_passed, f"Good slides should pass: {slides_issues}"
+
+
+def test_quality_report(qa_agent, qa_fixtures):
+    report = qa_agent.generate_quality_report(qa_fixtures['good_scripts'], qa_fixtures['good_slides'])
+    print(f"\n✓ Quality Report:")
+    print(f"  Overall: {'PASSED' if report['overall_passed'] else 'FAILED'}")
+    print(f"  Scripts: {report['stats']['num_scripts']}")
+    print(f"  Slides: {report['stats']['num_slides']}")
+    print(f"  Total narration: {report['stats']['total_narration_chars']} chars")
+    print(f"  Avg narration: {report['stats']['avg_narration_chars']} chars")
+    print(f"  Total bullets: {report['stats']['total_bullets']}")
+    print(f"  Images generated: {report['stats']['images_generated']}")
+    print(f"  Repetition rate: {report['stats']['repetition_rate']:.2%}")
+    assert report['stats']['num_scripts'] == 3
+    assert report['stats']['num_slides'] == 3
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-v', '-s']))
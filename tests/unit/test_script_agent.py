@@ -1,23 +1,35 @@
 """
 Unit tests for Script Agent
 """
-import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import os
+import pytest
 
 from agents.script_agent import ScriptAgent
 from src.utils.llm_client import LLMClient
 
 
-def test_script_agent():
-    """Test Script Agent with real LLM"""
+def test_script_agent(mock_llm_client):
+    """Test Script Agent with a recorded LLM response (PAPERAUTO_LIVE_LLM=1 for real LLM)"""
     print("\n=== Testing Script Agent ===")
     
     # Initialize LLM client
-    llm_client = LLMClient()
+    llm_client = mock_llm_client("script_agent")
     
     # Initialize Script Agent (without retriever for now)
-    script_agent = ScriptAgent(llm_client, retriever=None)
-    
+    _check_script(ScriptAgent(llm_client, retriever=None))
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(os.getenv("PAPERAUTO_INTEGRATION") != "1", reason="integration: set PAPERAUTO_INTEGRATION=1")
+@pytest.mark.xdist_group("live_llm")
+def test_script_agent_integration(llm_client):
+    """Test Script Agent against the real LLM"""
+    print("\n=== Testing Script Agent (integration) ===")
+    _check_script(ScriptAgent(llm_client, retriever=None))
+
+
+def _check_script(script_agent):
+    """Generate a script and validate bullets, narration length and Chinese ratio"""
     # Test section
     section = {
         'title': 'Introduction and Background',
@@ -71,17 +83,15 @@ def test_script_agent():
     total_tokens = meta.get('total_tokens', 0)
     print(f"✓ Token usage: {total_tokens} tokens")
     print(f"✓ Total cost: ${script_agent.total_cost:.4f}")
-    
-    return True
 
 
 if __name__ == '__main__':
     try:
-        test_script_agent()
+        test_script_agent_integration(LLMClient())
         print("\n✅ Script Agent test PASSED")
     except Exception as e:
         print(f"\n❌ Script Agent test FAILED: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        raise SystemExit(1)
 
@@ -1,24 +1,71 @@
 """
 Unit tests for Slide Agent
 """
-import sys
-sys.path.insert(0, '/Users/yxp/Documents/ghpaperauto')
+import os
+import pytest
 
 from pathlib import Path
 from agents.slide_agent import SlideAgent
 from src.utils.llm_client import LLMClient
 
+ROOT_DIR = Path(__file__).resolve().parents[2]
+CASSETTE = ROOT_DIR / "tests" / "cassettes" / "test_slide_agent.yaml"
 
-def test_slide_agent():
-    """Test Slide Agent with image generation"""
+
+def _has_image_provider():
+    return bool(
+        os.getenv("DASHSCOPE_API_KEY") or os.getenv("OPENAI_API_KEY")
+        or (os.getenv("IMAGE_API_URL") and os.getenv("IMAGE_API_KEY") and os.getenv("IMAGE_MODEL"))
+    )
+
+
+def _isolate_output(tmp_path, monkeypatch):
+    """Run from tmp_path so generated images land there instead of the repo's output/"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "prompts").symlink_to(ROOT_DIR / "prompts", target_is_directory=True)
+
+
+@pytest.mark.vcr
+def test_slide_agent(mock_llm_client, monkeypatch, tmp_path, request):
+    """
+    Test Slide Agent with a recorded LLM response and image generation
+
+    Image providers are only called in capture runs (PAPERAUTO_CAPTURE=1), which
+    record tests/cassettes/test_slide_agent.yaml. Later runs replay that cassette
+    when pytest-recording is installed, and draw the local placeholder otherwise.
+    """
     print("\n=== Testing Slide Agent ===")
     
     # Initialize LLM client
-    llm_client = LLMClient()
+    llm_client = mock_llm_client("slide_agent")
+    _isolate_output(tmp_path, monkeypatch)
     
     # Initialize Slide Agent
     slide_agent = SlideAgent(llm_client)
+    capture = os.getenv("PAPERAUTO_CAPTURE") == "1"
+    replay = (not capture and CASSETTE.exists() and _has_image_provider()
+              and request.config.pluginmanager.hasplugin("recording"))
+    if replay:
+        # Replayed cassettes answer instantly; skip provider retry/poll waits
+        monkeypatch.setattr('tools.image_gen.time.sleep', lambda *_: None)
+    elif not capture:
+        # Nothing to replay: never call the paid providers, render the local placeholder instead
+        slide_agent.image_generator.generate_image = slide_agent.image_generator._generate_placeholder
     
+    _check_slide_plan(slide_agent)
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(os.getenv("PAPERAUTO_INTEGRATION") != "1", reason="integration: set PAPERAUTO_INTEGRATION=1")
+@pytest.mark.xdist_group("live_llm")
+def test_slide_agent_integration(llm_client):
+    """Test Slide Agent against the real LLM and image providers"""
+    print("\n=== Testing Slide Agent (integration) ===")
+    _check_slide_plan(SlideAgent(llm_client))
+
+
+def _check_slide_plan(slide_agent):
+    """Generate a slide plan and validate bullets, image and token usage"""
     # Test script
     script = {
         'title': 'Transformer Architecture',
@@ -72,17 +119,15 @@ def test_slide_agent():
     total_tokens = meta.get('total_tokens', 0)
     print(f"✓ Token usage: {total_tokens} tokens")
     print(f"✓ Total cost: ${slide_agent.total_cost:.4f}")
-    
-    return True
 
 
 if __name__ == '__main__':
     try:
-        test_slide_agent()
+        test_slide_agent_integration(LLMClient())
         print("\n✅ Slide Agent test PASSED")
     except Exception as e:
         print(f"\n❌ Slide Agent test FAILED: {e}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        raise SystemExit(1)
 
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import wave
+
+import pytest
+
+from src.video.video_composer import _concat_wav_inplace, _run
+
+
+def _write_wav(path, n_frames, rate=16000):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\x01\x00" * n_frames)
+
+
+def test_concat_wav_inplace_joins_same_format_segments(tmp_path):
+    a, b, out = tmp_path / "a.wav", tmp_path / "b.wav", tmp_path / "out.wav"
+    _write_wav(a, 16000)
+    _write_wav(b, 8000)
+
+    duration = _concat_wav_inplace([str(a), str(b)], str(out))
+
+    assert duration == 1.5
+    with wave.open(str(out), "rb") as rf:
+        assert rf.getnframes() == 24000
+        assert rf.getframerate() == 16000
+
+
+def test_concat_wav_inplace_rejects_mismatched_rates(tmp_path):
+    a, b, out = tmp_path / "a.wav", tmp_path / "b.wav", tmp_path / "out.wav"
+    _write_wav(a, 16000, rate=16000)
+    _write_wav(b, 24000, rate=24000)
+
+    assert _concat_wav_inplace([str(a), str(b)], str(out)) is None
+    assert not out.exists()
+
+
+def test_concat_wav_inplace_falls_back_on_unreadable_wav(tmp_path):
+    a, b, out = tmp_path / "a.wav", tmp_path / "b.wav", tmp_path / "out.wav"
+    _write_wav(a, 16000)
+    b.write_bytes(b"RIFF\x00\x00\x00\x00WAVE")
+
+    assert _concat_wav_inplace([str(a), str(b)], str(out)) is None
+    assert not out.exists()
+
+
+def test_run_logs_tail_of_ffmpeg_stderr_on_failure():
+    logged = []
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('Invalid data found when processing input\\n'); sys.exit(1)"]
+    with pytest.raises(subprocess.CalledProcessError):
+        _run(cmd, logged.append, "compose")
+    assert "Invalid data found when processing input" in logged[-1]
@@ -2,25 +2,410 @@
 Image generation tool using ModelScope/DALL-E/Stable Diffusion
 """
 import os
+import asyncio
+import base64
+import functools
+import hashlib
+import io
+import json
 import logging
+import random
+import re
+import shutil
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait as futures_wait
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List, Tuple
 import time
+from types import MappingProxyType
+
+try:
+    import aiohttp  # optional: event-loop ModelScope batches
+except ImportError:
+    aiohttp = None
+
+try:
+    import numpy as np  # optional: semantic prompt cache
+except ImportError:
+    np = None
+
+try:
+    import orjson  # optional: faster request-body encoding
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl  # optional: cross-process image cache locks (POSIX only)
+except ImportError:
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
 
+# Style keywords appended to prompts by ImageGenerator._enhance_prompt (read-only;
+# _enhance_prompt is memoized, so the table must not change at runtime)
+_STYLE_KEYWORDS = MappingProxyType({
+    'professional': 'professional, clean, modern, business style',
+    'academic': 'academic, scholarly, educational, diagram style',
+    'technical': 'technical, engineering, blueprint, schematic style',
+    'illustration': 'illustration, artistic, colorful, infographic style'
+})
+# WebP quality for generated and placeholder images
+_WEBP_QUALITY = 85
+
+# Fully formed prompt suffix per style
+_STYLE_SUFFIX = MappingProxyType({k: f", {v}, high quality, detailed" for k, v in _STYLE_KEYWORDS.items()})
+
+
+# Connect/read timeouts for every image HTTP call; synchronous generation requests may take minutes
+_HTTP_TIMEOUT = (5, 60)
+_GENERATION_TIMEOUT = (5, 300)
+
+# Default output resolution (width, height)
+_DEFAULT_IMAGE_SIZE = (1024, 1024)
+_IMAGE_SIZE_RE = re.compile(r"^\s*(\d+)\s*[x*×,]\s*(\d+)\s*$", re.IGNORECASE)
+_IMAGE_SIZE_RANGE = (64, 4096)
+
+# Fixed output sizes accepted by each provider model; a requested size is mapped to the nearest one.
+# Models missing here (OpenAI-compatible servers, ModelScope) get the requested size unchanged
+_DASHSCOPE_SIZES = ((1024, 1024), (720, 1280), (768, 1152), (1280, 720))
+_OPENAI_SIZES = {
+    "dall-e-2": ((256, 256), (512, 512), (1024, 1024)),
+    "dall-e-3": ((1024, 1024), (1792, 1024), (1024, 1792)),
+    "gpt-image-1": ((1024, 1024), (1536, 1024), (1024, 1536)),
+}
+
+# DashScope wanx-v1 returns at most 4 images per request
+_DASHSCOPE_MAX_N = 4
+
+# Provider retry backoff: base * 2**attempt capped at _RETRY_CAP, plus up to _RETRY_JITTER of random
+# jitter so concurrent slides do not retry in lockstep; a server Retry-After wins up to _RETRY_AFTER_MAX
+_RETRY_BASE = 1.0
+_RETRY_CAP = 8.0
+_RETRY_JITTER = 0.25
+_RETRY_AFTER_MAX = 30.0
+
+
+def _poll_wait(delay: float, headers, deadline: float) -> float:
+    """Next poll sleep: the backoff delay, or the server's numeric Retry-After if longer, within the deadline"""
+    try:
+        delay = max(delay, float(headers.get("Retry-After", 0)))
+    except (TypeError, ValueError):
+        pass  # HTTP-date form: keep our own backoff
+    return max(0.0, min(delay, deadline - time.monotonic()))
+
+
+class _TransientHTTPError(RuntimeError):
+    """Retryable provider HTTP status (429/5xx); keeps the response headers for Retry-After"""
+
+    def __init__(self, message: str, headers=None):
+        super().__init__(message)
+        self.headers = headers or {}
+
+
+class _ExpiredURLError(RuntimeError):
+    """A provider's result URL answered 401/403/404/410: it expired or never existed, retrying cannot help"""
+
+
+# Download statuses that mean the result URL itself is dead
+_EXPIRED_URL_STATUS = (401, 403, 404, 410)
+
+
+def _parse_image_size(value) -> Tuple[int, int]:
+    """(width, height) from a "WxH" / "W*H" string or a pair; _DEFAULT_IMAGE_SIZE (with a warning) if invalid"""
+    try:
+        if isinstance(value, str):
+            match = _IMAGE_SIZE_RE.match(value)
+            if not match:
+                raise ValueError("expected WxH, e.g. 1024x1024")
+            value = match.groups()
+        width, height = (int(v) for v in value)
+        low, high = _IMAGE_SIZE_RANGE
+        if not (low <= width <= high and low <= height <= high):
+            raise ValueError(f"each side must be within {low}-{high}")
+        return width, height
+    except (TypeError, ValueError) as e:
+        logger.warning(f"[ImageGen] Invalid image size {value!r} ({e}); using "
+                       f"{_DEFAULT_IMAGE_SIZE[0]}x{_DEFAULT_IMAGE_SIZE[1]}")
+        return _DEFAULT_IMAGE_SIZE
+
+
+def _nearest_size(size: Tuple[int, int], supported) -> Tuple[int, int]:
+    """The supported size closest to `size`: same aspect ratio first, then the nearest area"""
+    ratio, area = size[0] / size[1], size[0] * size[1]
+    return min(supported, key=lambda s: (round(abs(s[0] / s[1] - ratio), 2), abs(s[0] * s[1] - area)))
+
+
+def _retry_delay(attempt: int, err: Optional[BaseException] = None) -> float:
+    """Sleep before retry `attempt` + 1: capped exponential backoff with jitter, or the server's Retry-After"""
+    delay = min(_RETRY_CAP, _RETRY_BASE * 2 ** attempt) + random.uniform(0, _RETRY_JITTER)
+    # _TransientHTTPError / aiohttp errors carry .headers; requests and OpenAI SDK errors carry .response.headers
+    headers = getattr(err, "headers", None) or getattr(getattr(err, "response", None), "headers", None)
+    if headers:
+        try:
+            delay = max(delay, min(float(headers.get("Retry-After", 0)), _RETRY_AFTER_MAX))
+        except (TypeError, ValueError):
+            pass  # HTTP-date form: keep our own backoff
+    return delay
+
+
+def _dumps(obj) -> bytes:
+    """JSON-encode a request body to UTF-8 bytes once (reused across retries); orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _build_session() -> requests.Session:
+    """
+    Process-wide keep-alive session for image HTTP calls
+
+    Idempotent GETs (downloads, task polls) are retried by the adapter on
+    connection errors and 429/5xx with exponential backoff; POST submissions are
+    not, since a retried submit could start a second (billed) generation task.
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'paperauto/1.0'})
+    retry = Retry(
+        total=4,
+        backoff_factor=1,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+
+# Optional SDKs are imported on first use and cached for the process
+@functools.lru_cache(maxsize=None)
+def _pil():
+    from PIL import Image, ImageDraw, ImageFont
+    return Image, ImageDraw, ImageFont
+
+
+@functools.lru_cache(maxsize=None)
+def _dashscope():
+    import dashscope
+    from dashscope import ImageSynthesis
+    return dashscope, ImageSynthesis
+
+
+@functools.lru_cache(maxsize=None)
+def _placeholder_font(size: int = 40):
+    """Placeholder font, loaded and parsed once per size"""
+    _, _, ImageFont = _pil()
+    try:
+        return ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=None)
+def _placeholder_base():
+    """Blank 1024x1024 placeholder canvas; callers draw on a .copy()"""
+    Image, _, _ = _pil()
+    return Image.new('RGB', (1024, 1024), color=(240, 240, 245))
+
+
+@functools.lru_cache(maxsize=256)
+def _placeholder_bytes(text: str, image_format: str) -> bytes:
+    """Encoded placeholder: `text` centred on the shared blank canvas"""
+    _, ImageDraw, _ = _pil()
+
+    # Create image (copy of the shared blank canvas)
+    img = _placeholder_base().copy()
+    draw = ImageDraw.Draw(img)
+    text_width, text_height = _placeholder_text_size(text)
+    x = (1024 - text_width) // 2
+    y = (1024 - text_height) // 2
+    draw.text((x, y), text, fill=(100, 100, 120), font=_placeholder_font())
+
+    # WebP is much smaller than PNG; method=0 is the fastest encoder, fine for a flat canvas
+    buf = io.BytesIO()
+    if image_format == "webp":
+        img.save(buf, 'WEBP', quality=_WEBP_QUALITY, method=0)
+    else:
+        img.save(buf, 'PNG', compress_level=1)
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def _embedding_function():
+    """Chroma's default embedding function (all-MiniLM-L6-v2, ONNX on CPU), as used by retrieval/"""
+    from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+    return DefaultEmbeddingFunction()
+
+
+@functools.lru_cache(maxsize=256)
+def _prompt_embedding(text: str):
+    """Unit-normalized float32 embedding of a prompt"""
+    vec = np.asarray(_embedding_function()([text])[0], dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+@functools.lru_cache(maxsize=256)
+def _placeholder_text_size(text: str):
+    """(width, height) of placeholder text in the placeholder font"""
+    metrics = _placeholder_ascii_metrics()
+    if metrics is not None and text.isascii() and text.isprintable():
+        # ASCII fast path: sum of advance widths (kerning ignored; only used for centring)
+        widths, height = metrics
+        return round(sum(widths[ch] for ch in text)), height
+    _, ImageDraw, _ = _pil()
+    bbox = ImageDraw.Draw(_placeholder_base()).textbbox((0, 0), text, font=_placeholder_font())
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+@functools.lru_cache(maxsize=None)
+def _placeholder_ascii_metrics():
+    """({printable ASCII char: advance width}, ascent + descent) of the placeholder font, or None"""
+    font = _placeholder_font()
+    try:
+        ascent, descent = font.getmetrics()
+        return {chr(c): font.getlength(chr(c)) for c in range(32, 127)}, ascent + descent
+    except AttributeError:
+        return None  # bitmap font without advance metrics: measure with textbbox
+
+
+@functools.lru_cache(maxsize=None)
+def _provider_pool() -> ThreadPoolExecutor:
+    """Worker threads for SDK-based providers called from the async path"""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="imagegen")
+
+
+@functools.lru_cache(maxsize=None)
+def _openai_client(api_key: str):
+    """One OpenAI client (and HTTP connection pool) per API key"""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+# A diffusers pipeline holds one set of GPU buffers: serialize inference through it
+_DIFFUSERS_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _diffusers_pipeline(model: str):
+    """fp16 text-to-image pipeline on CUDA, loaded once per model; RuntimeError without a GPU"""
+    import torch
+    from diffusers import AutoPipelineForText2Image
+
+    if not torch.cuda.is_available():
+        raise RuntimeError("no CUDA device for local image generation")
+    pipe = AutoPipelineForText2Image.from_pretrained(model, torch_dtype=torch.float16).to("cuda")
+    try:
+        pipe.enable_xformers_memory_efficient_attention()
+    except Exception:
+        pass  # xformers missing: PyTorch 2 scaled-dot-product attention is used instead
+    pipe.enable_vae_slicing()
+    try:
+        from DeepCache import DeepCacheSDHelper  # optional: reuse UNet block features across steps
+    except ImportError:
+        return pipe
+    helper = DeepCacheSDHelper(pipe=pipe)
+    helper.set_params(cache_interval=int(os.getenv("IMAGE_LOCAL_CACHE_INTERVAL", "3")), cache_branch_id=0)
+    helper.enable()
+    return pipe
+
+
 class ImageGenerator:
     """Generate images for slides using various APIs"""
 
-    def __init__(self):
+    def __init__(self, size: Optional[Tuple[int, int]] = None):
         self.output_dir = Path("output/generated_images")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Output resolution for every provider (IMAGE_SIZE=WxH); slides rarely show more than ~960px,
+        # and a smaller image is generated faster and downloads lighter. Accepted sizes vary by provider
+        # (an invalid value falls back to the default); each provider gets its nearest supported size
+        size = _parse_image_size(os.getenv("IMAGE_SIZE", "1024x1024") if size is None else size)
+        self.image_size = size
+        self._openai_size = os.getenv("OPENAI_IMAGE_SIZE") or f"{size[0]}x{size[1]}"
+        self._dashscope_size = "{}*{}".format(*_nearest_size(size, _DASHSCOPE_SIZES))
+        self._openai_quality = os.getenv("OPENAI_IMAGE_QUALITY", "standard")  # DALL-E 3: standard | hd
+
         # Check available API keys
         self.openai_key = os.getenv('OPENAI_API_KEY')
         self.dashscope_key = os.getenv('DASHSCOPE_API_KEY')
+        modelscope_cfg = (os.getenv("IMAGE_API_URL"), os.getenv("IMAGE_API_KEY"), os.getenv("IMAGE_MODEL"))
+        self._modelscope_cfg = modelscope_cfg if all(modelscope_cfg) else None
+
+        # Provider chain and cache signature are fixed for the generator's lifetime
+        providers = []
+        # Local diffusers model (IMAGE_LOCAL_MODEL, needs a CUDA GPU) goes first: no per-image API cost
+        self.local_model = os.getenv("IMAGE_LOCAL_MODEL")
+        if self.local_model:
+            providers.append(self._generate_with_diffusers)
+        if self.dashscope_key:
+            providers.append(self._generate_with_dashscope)
+        if self.openai_key:
+            providers.append(self._generate_with_dalle)
+            providers.append(self._generate_with_openai_rest)
+        # ModelScope Image API if configured
+        if self._modelscope_cfg:
+            providers.append(self._generate_with_modelscope)
+        # 禁止使用占位图作为回退；如果所有真实提供方均失败，则抛出异常
+        # providers.append(self._generate_placeholder)
+        self._providers = tuple(providers)
+        # Opt-in (IMAGE_PLACEHOLDER_FALLBACK=1): draw a placeholder alongside the providers
+        # and return it only when every provider fails
+        self.placeholder_fallback = os.getenv("IMAGE_PLACEHOLDER_FALLBACK", "0").lower() in ("1", "on", "true")
+        # Providers are tried in order by default (one paid image per slide). Opt-in racing:
+        # IMAGE_PROVIDER_RACE=hedge starts them one by one, hedging a slow one after its p95 latency;
+        # IMAGE_PROVIDER_RACE=1 starts them all at once. Either way, providers billed to the same
+        # key never run concurrently (see _credential)
+        race_mode = os.getenv("IMAGE_PROVIDER_RACE", "0").lower()
+        self._race = len(self._providers) > 1 and race_mode in ("1", "on", "true", "hedge")
+        self._hedge = self._race and race_mode == "hedge"
+        self._latencies: Dict[str, deque] = {}
+        # Output format for every generated image: webp (default) or png (for consumers without WebP support)
+        self.image_format = "png" if os.getenv("IMAGE_FORMAT", "webp").lower() == "png" else "webp"
+        self._signature = f"{self._models_signature()}|{self.image_format}"
+
+        # Content-addressed cache of generated images (PAPERAUTO_IMAGE_CACHE=off to bypass)
+        self.cache_dir = self.output_dir / "cache"
+        self.cache_enabled = os.getenv("PAPERAUTO_IMAGE_CACHE", "on").lower() not in ("off", "0", "false")
+        # Least-recently-used entries are evicted beyond this size
+        self.cache_max_bytes = int(float(os.getenv("PAPERAUTO_IMAGE_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+        # Per-key lock files (kept outside cache_dir so they never count as cache entries)
+        self._lock_dir = self.output_dir / "cache_locks"
+
+        # Opt-in semantic cache: reuse the image of a paraphrased prompt (cosine >= threshold)
+        self.semantic_cache_enabled = (
+            self.cache_enabled and np is not None
+            and os.getenv("PAPERAUTO_IMAGE_SEMANTIC_CACHE", "0").lower() in ("1", "on", "true")
+        )
+        self.semantic_threshold = float(os.getenv("PAPERAUTO_IMAGE_SEMANTIC_THRESHOLD", "0.92"))
+        self._semantic_dir = self.cache_dir / "semantic"
+        self._semantic_index = None  # (matrix[n, dim], entries), loaded on first use
+        self._semantic_mtime = None  # entries.json version the in-memory index was loaded from
+        self._semantic_rows: Dict[Tuple[str, str], List[int]] = {}  # (style, models) -> index rows
+        self._semantic_lock = threading.Lock()
+
+        # In-flight generations by cache key: concurrent requests for the same image share one API call.
+        # One thread-safe map serves generate_image and generate_image_async (on any event loop) alike
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Keep-alive HTTP session shared by all generators (ModelScope submit/poll and downloads)
+        self._http = _SESSION
+
+        # Import the provider SDKs in the background so the first slide does not pay for it
+        if self.dashscope_key:
+            _provider_pool().submit(_dashscope)
+        if self.openai_key:
+            _provider_pool().submit(_openai_client, self.openai_key)
 
     def generate_image(self, prompt: str, slide_id: str, style: str = "professional") -> Optional[str]:
         """
@@ -34,20 +419,480 @@ class ImageGenerator:
         Returns:
             Path to generated image file, or None if failed
         """
-        # Try different providers in order
-        providers = []
+        cache_key = self._cache_key(prompt, style) if self.cache_enabled else None
+        cached = self._cache_lookup(cache_key, slide_id)
+        if not cached and self.semantic_cache_enabled:
+            cached = self._semantic_lookup(prompt, style, slide_id)
+        if cached:
+            return cached
+
+        flight_key = cache_key or self._cache_key(prompt, style)
+        with self._inflight_lock:
+            flight = self._inflight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[flight_key] = Future()
+        if not leader:
+            # Another thread is generating the same image: wait for it and link the result
+            src = flight.result()
+            logger.info(f"Sharing in-flight image for {slide_id}: {src}")
+            return self._link_image(src, slide_id) or src
 
+        lock = None
+        placeholder = None
+        try:
+            lock = self._lock_cache_key(cache_key)
+            # Another process may have stored the image while this one waited for the lock
+            cached = self._cache_lookup(cache_key, slide_id) if lock else None
+            if cached:
+                flight.set_result(cached)
+                return cached
+            placeholder = self._start_placeholder(prompt, slide_id, style)
+            try:
+                image_path = self._normalize_image(self._generate_uncached(prompt, slide_id, style))
+            except RuntimeError:
+                if placeholder is None or not placeholder.result():
+                    raise
+                # Placeholders are never cached: the next run retries the real providers
+                image_path = placeholder.result()
+                logger.warning(f"All image providers failed for {slide_id}; using placeholder {image_path}")
+                flight.set_result(image_path)
+                return image_path
+            self._discard_result(placeholder)
+            self._cache_store(cache_key, image_path)
+            if self.semantic_cache_enabled:
+                self._semantic_add(prompt, style, cache_key)
+            flight.set_result(image_path)
+            return image_path
+        except BaseException as e:
+            self._discard_result(placeholder)
+            flight.set_exception(e)
+            raise
+        finally:
+            self._unlock_cache_key(lock)
+            with self._inflight_lock:
+                self._inflight.pop(flight_key, None)
+
+    async def generate_image_async(self, prompt: str, slide_id: str, style: str = "professional",
+                                   session=None) -> Optional[str]:
+        """
+        Async variant of generate_image
+
+        With aiohttp installed, REST providers (ModelScope, OpenAI Images REST)
+        run natively on the event loop over `session` (a private one if omitted);
+        SDK-based providers (DashScope, DALL-E SDK) run in worker threads. Racing
+        uses asyncio.wait(FIRST_COMPLETED) and cancels the losers. Without aiohttp
+        the whole sync generate_image runs in a worker thread.
+        """
+        if aiohttp is None:
+            return await asyncio.to_thread(self.generate_image, prompt, slide_id, style)
+        if session is None:
+            async with aiohttp.ClientSession(headers={'User-Agent': 'paperauto/1.0'}) as session:
+                return await self.generate_image_async(prompt, slide_id, style, session=session)
+
+        cache_key = self._cache_key(prompt, style) if self.cache_enabled else None
+        cached = self._cache_lookup(cache_key, slide_id)
+        if not cached and self.semantic_cache_enabled:
+            cached = await asyncio.to_thread(self._semantic_lookup, prompt, style, slide_id)
+        if cached:
+            return cached
+
+        flight_key = cache_key or self._cache_key(prompt, style)
+        with self._inflight_lock:
+            flight = self._inflight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[flight_key] = Future()
+        if not leader:
+            # Another task or thread is generating the same image: wait for it and link the result.
+            # shield: cancelling this waiter must not cancel the leader's future
+            src = await asyncio.shield(asyncio.wrap_future(flight))
+            logger.info(f"Sharing in-flight image for {slide_id}: {src}")
+            return self._link_image(src, slide_id) or src
+
+        lock = None
+        placeholder = None
+        try:
+            # flock blocks: wait for another process's generation in a worker thread
+            lock = await asyncio.to_thread(self._lock_cache_key, cache_key)
+            cached = self._cache_lookup(cache_key, slide_id) if lock else None
+            if cached:
+                flight.set_result(cached)
+                return cached
+            placeholder = self._start_placeholder(prompt, slide_id, style)
+            try:
+                image_path = await self._generate_uncached_async(session, prompt, slide_id, style)
+            except RuntimeError:
+                if placeholder is None or not await asyncio.wrap_future(placeholder):
+                    raise
+                image_path = placeholder.result()
+                logger.warning(f"All image providers failed for {slide_id}; using placeholder {image_path}")
+                flight.set_result(image_path)
+                return image_path
+            self._discard_result(placeholder)
+            image_path = await asyncio.to_thread(self._normalize_image, image_path)
+            self._cache_store(cache_key, image_path)
+            if self.semantic_cache_enabled:
+                await asyncio.to_thread(self._semantic_add, prompt, style, cache_key)
+            flight.set_result(image_path)
+            return image_path
+        except asyncio.CancelledError:
+            self._discard_result(placeholder)
+            flight.cancel()
+            raise
+        except BaseException as e:
+            self._discard_result(placeholder)
+            flight.set_exception(e)
+            raise
+        finally:
+            self._unlock_cache_key(lock)
+            with self._inflight_lock:
+                self._inflight.pop(flight_key, None)
+
+    def _start_placeholder(self, prompt: str, slide_id: str, style: str) -> Optional[Future]:
+        """
+        Start drawing the fallback placeholder next to the provider calls (opt-in)
+
+        The PIL work overlaps the provider's network wait, so a fallback is ready the
+        moment every provider has failed instead of adding its own time after them.
+        """
+        if not self.placeholder_fallback:
+            return None
+        return _provider_pool().submit(self._generate_placeholder, prompt, slide_id, style)
+
+    @staticmethod
+    def _discard_result(fut: Optional[Future]) -> None:
+        """Drop an unneeded image (placeholder, race loser): cancel it if not started, else delete its file once written"""
+        if fut is None or fut.cancel():
+            return
+
+        def _remove(done: Future) -> None:
+            path = None if done.cancelled() or done.exception() else done.result()
+            if path:
+                Path(path).unlink(missing_ok=True)
+
+        fut.add_done_callback(_remove)
+
+    def _provider_call(self, session, provider, prompt: str, slide_id: str, style: str):
+        """
+        Start one provider: its native <name>_async variant if any, else a worker thread
+
+        Returns (awaitable, worker future or None); the worker future lets a race loser's
+        file be deleted once its thread finishes, since cancelling the awaitable cannot stop it.
+        """
+        async_impl = getattr(self, f"{provider.__name__}_async", None)
+        if async_impl is not None:
+            return asyncio.ensure_future(async_impl(session, prompt, slide_id, style)), None
+        # Not the loop's default executor: asyncio.run() would wait for abandoned race losers
+        worker = _provider_pool().submit(provider, prompt, slide_id, style)
+        return asyncio.wrap_future(worker), worker
+
+    async def _generate_uncached_async(self, session, prompt: str, slide_id: str, style: str) -> str:
+        """Async counterpart of _generate_uncached (same provider chain, racing and errors)"""
+        last_err = None
+        if self._race:
+            timeout = float(os.getenv("IMAGE_PROVIDER_TIMEOUT", "300"))
+            waiting = list(self._providers)
+            tasks = {}  # task -> (provider, start time, worker future)
+            pending = set()
+
+            def launch():
+                provider = self._next_launchable(waiting, (tasks[t][0] for t in pending))
+                if provider is None:
+                    return None
+                waiting.remove(provider)
+                task, worker = self._provider_call(session, provider, prompt, slide_id, style)
+                tasks[task] = (provider, time.monotonic(), worker)
+                pending.add(task)
+                return task
+
+            newest = launch()
+            while not self._hedge and launch():
+                pass
+            deadline = time.monotonic() + timeout
+            try:
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        last_err = TimeoutError(f"timed out after {timeout:.0f}s")
+                        logger.warning(f"Image providers timed out after {timeout:.0f}s for slide {slide_id}")
+                        break
+                    can_hedge = self._next_launchable(waiting, (tasks[t][0] for t in pending)) is not None
+                    hedge_in = self._hedge_in(*tasks[newest][:2]) if can_hedge else remaining
+                    done, _ = await asyncio.wait(pending, timeout=min(remaining, hedge_in),
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    pending.difference_update(done)
+                    for task in done:
+                        provider, started, _ = tasks[task]
+                        try:
+                            image_path = task.result()
+                        except Exception as e:
+                            last_err = e
+                            logger.warning(f"Image generation failed with {provider.__name__}: {e}")
+                            continue
+                        if image_path and Path(image_path).exists():
+                            self._record_latency(provider, time.monotonic() - started)
+                            logger.info(f"Generated image: {image_path} (via {provider.__name__})")
+                            if pending:
+                                logger.info(f"Cancelling slower providers for {slide_id}: "
+                                            f"{', '.join(tasks[t][0].__name__ for t in pending)}")
+                            return image_path
+                    if not self._hedge:
+                        while launch():
+                            pass
+                    elif waiting and (newest not in pending or self._hedge_in(*tasks[newest][:2]) <= 0):
+                        hedged = launch()
+                        if hedged is not None:
+                            if len(pending) > 1:
+                                logger.info(f"Hedging slide {slide_id} with {tasks[hedged][0].__name__}")
+                            newest = hedged
+            finally:
+                for task in pending:
+                    task.cancel()
+                    # A worker thread keeps running after cancel(); drop its image once written
+                    self._discard_result(tasks[task][2])
+        else:
+            for provider in self._providers:
+                try:
+                    task, _ = self._provider_call(session, provider, prompt, slide_id, style)
+                    image_path = await task
+                    if image_path and Path(image_path).exists():
+                        logger.info(f"Generated image: {image_path}")
+                        return image_path
+                except Exception as e:
+                    last_err = e
+                    logger.warning(f"Image generation failed with {provider.__name__}: {e}")
+
+        raise RuntimeError(f"All image providers failed for slide {slide_id}: {last_err}")
+
+    def _cache_lookup(self, cache_key: Optional[str], slide_id: str) -> Optional[str]:
+        """
+        On a cache hit, link the cached image to the slide's own file and return that
+
+        The slide keeps a file of its own, so later eviction cannot remove an image
+        a deck still points to. The entry's mtime is refreshed for LRU eviction.
+        """
+        if not cache_key:
+            return None
+        # Entries are normally stored in image_format: one stat; other suffixes need a directory scan
+        cached = self.cache_dir / f"{cache_key}.{self.image_format}"
+        if not cached.is_file():
+            cached = next(self.cache_dir.glob(f"{cache_key}.*"), None)
+            if cached is None:
+                return None
+        logger.info(f"Image cache hit for {slide_id}: {cached}")
+        try:
+            os.utime(cached)
+        except OSError:
+            pass
+        return self._link_image(str(cached), slide_id) or str(cached)
+
+    def _lock_cache_key(self, cache_key: Optional[str]):
+        """
+        Exclusive cross-process lock for one cache key, or None (cache off / no fcntl)
+
+        Pipelines running in several processes would otherwise all miss the cache
+        for the same image and each pay for it; with the lock, one generates and
+        the others find its result in the cache. Released by _unlock_cache_key,
+        or by the OS if the process dies.
+        """
+        if not cache_key:
+            return None
+        return self._file_lock(cache_key)
+
+    def _file_lock(self, name: str, shared: bool = False):
+        """flock on <_lock_dir>/<name>.lock (exclusive unless `shared`), or None if unavailable"""
+        if fcntl is None:
+            return None
+        try:
+            self._lock_dir.mkdir(parents=True, exist_ok=True)
+            lock = open(self._lock_dir / f"{name}.lock", "a")
+        except OSError as e:
+            logger.warning(f"Image cache lock unavailable for {name}: {e}")
+            return None
+        try:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        except OSError as e:
+            # e.g. ENOLCK on NFS: generate without the cross-process lock
+            lock.close()
+            logger.warning(f"Image cache lock unavailable for {name}: {e}")
+            return None
+        except BaseException:
+            lock.close()
+            raise
+        return lock
+
+    @staticmethod
+    def _unlock_cache_key(lock) -> None:
+        """Release a _lock_cache_key lock (closing the file drops the flock)"""
+        if lock is not None:
+            lock.close()
+
+    def _cache_store(self, cache_key: Optional[str], image_path: str):
+        """
+        Hardlink (or copy) a freshly generated image into the cache, then evict beyond the size cap
+
+        The entry is staged under a temporary name and renamed into place, so a
+        concurrent lookup (another thread or process) never sees a partial copy.
+        """
+        if not cache_key:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path = self.cache_dir / f"{cache_key}{Path(image_path).suffix}"
+        tmp_path = self.cache_dir / f".{cache_key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                os.link(image_path, tmp_path)
+            except OSError:
+                shutil.copyfile(image_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Failed to cache image {image_path}: {e}")
+            return
+        self._evict_cache()
+
+    def _evict_cache(self):
+        """Delete least-recently-used cache entries until the cache fits cache_max_bytes"""
+        try:
+            entries = [(p.stat(), p) for p in self.cache_dir.iterdir() if p.is_file()]
+        except OSError:
+            return
+        total = sum(st.st_size for st, _ in entries)
+        if total <= self.cache_max_bytes:
+            return
+        for st, path in sorted(entries, key=lambda e: e[0].st_mtime):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= st.st_size
+            logger.info(f"Evicted cached image {path.name}")
+            if total <= self.cache_max_bytes:
+                break
+
+    def _has_async_provider(self) -> bool:
+        """True when a configured provider has a native aiohttp variant"""
+        return any(hasattr(self, f"{p.__name__}_async") for p in self._providers)
+
+    def _cache_key(self, prompt: str, style: str) -> str:
+        """Hash of (prompt, style, configured provider models)"""
+        raw = f"{prompt}|{style}|{self._signature}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _models_signature(self) -> str:
+        """Configured provider models; cached images are only reused for the same set"""
+        models = []
+        if self.local_model:
+            models.append(f"local:{self.local_model}")
         if self.dashscope_key:
-            providers.append(self._generate_with_dashscope)
+            models.append("dashscope:wanx-v1")
         if self.openai_key:
-            providers.append(self._generate_with_dalle)
-            providers.append(self._generate_with_openai_rest)
-        # ModelScope Image API if configured
-        if os.getenv("IMAGE_API_URL") and os.getenv("IMAGE_API_KEY") and os.getenv("IMAGE_MODEL"):
-            providers.append(self._generate_with_modelscope)
+            models.append(f"openai:{os.getenv('OPENAI_IMAGE_MODEL', '')}:{self._openai_size}")
+            if self._openai_quality != "standard":
+                models.append(f"quality:{self._openai_quality}")
+        if self._modelscope_cfg:
+            models.append(f"modelscope:{self._modelscope_cfg[2]}")
+        # Only non-default sizes are recorded, so existing cache entries stay valid
+        if self.image_size != _DEFAULT_IMAGE_SIZE:
+            models.append(f"size:{self.image_size[0]}x{self.image_size[1]}")
+        return ",".join(models)
 
-        # 禁止使用占位图作为回退；如果所有真实提供方均失败，则抛出异常
-        # providers.append(self._generate_placeholder)
+    def _load_semantic_index(self, locked: bool = False):
+        """
+        (matrix, entries) of the semantic cache; must be called with _semantic_lock held
+
+        Reloaded whenever entries.json changed on disk, so entries added by other
+        processes are picked up. Reads hold the shared "semantic" file lock (unless
+        the caller already holds it exclusively, `locked`), so they never see
+        embeddings.npy and entries.json from different writes.
+        """
+        npy, meta = self._semantic_dir / "embeddings.npy", self._semantic_dir / "entries.json"
+        try:
+            mtime = meta.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if self._semantic_index is None or mtime != self._semantic_mtime:
+            matrix, entries = None, []
+            if mtime is not None:
+                lock = None if locked else self._file_lock("semantic", shared=True)
+                try:
+                    matrix = np.load(npy)
+                    with open(meta, encoding="utf-8") as f:
+                        entries = json.load(f)
+                finally:
+                    self._unlock_cache_key(lock)
+                if len(entries) != len(matrix):
+                    matrix, entries = None, []
+            self._semantic_index = (matrix, entries)
+            self._semantic_mtime = mtime
+            self._semantic_rows = {}
+            for row, entry in enumerate(entries):
+                self._semantic_rows.setdefault((entry["style"], entry["models"]), []).append(row)
+        return self._semantic_index
+
+    def _semantic_lookup(self, prompt: str, style: str, slide_id: str) -> Optional[str]:
+        """Reuse the cached image of the most similar earlier prompt (same style and models)"""
+        try:
+            vec = _prompt_embedding(prompt)
+            with self._semantic_lock:
+                matrix, entries = self._load_semantic_index()
+                rows = self._semantic_rows.get((style, self._signature))
+                if matrix is None or not rows:
+                    return None
+                # Score only the rows of this style and model set
+                scores = matrix[rows] @ vec
+                order = np.argsort(-scores)
+                candidates = [(float(scores[i]), entries[rows[i]]) for i in order
+                              if scores[i] >= self.semantic_threshold]
+            # Most similar first; skip entries whose image was evicted from the exact cache since
+            for score, entry in candidates:
+                cached = self._cache_lookup(entry["key"], slide_id)
+                if cached:
+                    logger.info(f"Semantic image cache hit for {slide_id} (cos={score:.3f}): '{entry['prompt'][:60]}'")
+                    return cached
+            return None
+        except Exception as e:
+            logger.warning(f"Semantic image cache disabled: {e}")
+            self.semantic_cache_enabled = False
+            return None
+
+    def _semantic_add(self, prompt: str, style: str, cache_key: Optional[str]):
+        """Record a freshly cached image under its prompt embedding and persist the index"""
+        try:
+            vec = _prompt_embedding(prompt)
+            with self._semantic_lock:
+                # Exclusive across processes: re-read the latest index, append, then swap both files in
+                lock = self._file_lock("semantic")
+                try:
+                    matrix, entries = self._load_semantic_index(locked=True)
+                    matrix = vec[None, :] if matrix is None else np.vstack([matrix, vec[None, :]])
+                    entry = {"key": cache_key, "prompt": prompt, "style": style, "models": self._signature}
+                    entries = entries + [entry]
+                    self._semantic_dir.mkdir(parents=True, exist_ok=True)
+                    npy, meta = self._semantic_dir / "embeddings.npy", self._semantic_dir / "entries.json"
+                    tmp_npy, tmp_meta = npy.with_suffix(f".{os.getpid()}.tmp"), meta.with_suffix(f".{os.getpid()}.tmp")
+                    with open(tmp_npy, "wb") as f:
+                        np.save(f, matrix)
+                    with open(tmp_meta, "w", encoding="utf-8") as f:
+                        json.dump(entries, f, ensure_ascii=False)
+                    os.replace(tmp_npy, npy)
+                    os.replace(tmp_meta, meta)
+                    self._semantic_index = (matrix, entries)
+                    self._semantic_mtime = meta.stat().st_mtime_ns
+                    self._semantic_rows.setdefault((style, entry["models"]), []).append(len(entries) - 1)
+                finally:
+                    self._unlock_cache_key(lock)
+        except Exception as e:
+            logger.warning(f"Semantic image cache disabled: {e}")
+            self.semantic_cache_enabled = False
+
+    def _generate_uncached(self, prompt: str, slide_id: str, style: str) -> str:
+        """Try the configured providers (see generate_image)"""
+        # Try different providers in order (chain resolved once in __init__)
+        providers = self._providers
+        if self._race:
+            return self._race_providers(providers, prompt, slide_id, style)
 
         last_err = None
         for provider in providers:
@@ -62,37 +907,327 @@ class ImageGenerator:
 
         raise RuntimeError(f"All image providers failed for slide {slide_id}: {last_err}")
 
+    def _race_providers(self, providers, prompt: str, slide_id: str, style: str) -> str:
+        """
+        Run the configured providers concurrently and return the first usable image
+
+        Latency becomes max(provider) for a failing provider chain instead of the sum,
+        at the price of paying every provider that was started. Providers write to
+        distinct files (<slide_id>_<provider>.*), so late finishers do not clobber the
+        winner; their files are deleted once they finish. Providers sharing an API key
+        (DALL-E SDK and OpenAI REST) never overlap: the later one only starts after the
+        earlier one has failed.
+
+        With IMAGE_PROVIDER_RACE=hedge, providers start in order instead: the next one
+        is launched as soon as the newest one has failed, or once it has run longer
+        than its rolling p95 latency (a hedged request). A healthy primary then costs
+        one image, and a slow one is covered without waiting it out.
+        """
+        timeout = float(os.getenv("IMAGE_PROVIDER_TIMEOUT", "300"))
+        executor = ThreadPoolExecutor(max_workers=len(providers))
+        waiting = list(providers)
+        futures = {}  # future -> (provider, start time)
+        pending = set()
+
+        def launch():
+            provider = self._next_launchable(waiting, (futures[f][0] for f in pending))
+            if provider is None:
+                return None
+            waiting.remove(provider)
+            fut = executor.submit(provider, prompt, slide_id, style)
+            futures[fut] = (provider, time.monotonic())
+            pending.add(fut)
+            return fut
+
+        newest = launch()
+        while not self._hedge and launch():
+            pass
+        deadline = time.monotonic() + timeout
+        last_err = None
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    last_err = TimeoutError(f"timed out after {timeout:.0f}s")
+                    logger.warning(f"Image providers timed out after {timeout:.0f}s for slide {slide_id}")
+                    break
+                can_hedge = self._next_launchable(waiting, (futures[f][0] for f in pending)) is not None
+                hedge_in = self._hedge_in(*futures[newest]) if can_hedge else remaining
+                done, not_done = futures_wait(pending, timeout=min(remaining, hedge_in), return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+                for fut in done:
+                    provider, started = futures[fut]
+                    try:
+                        image_path = fut.result()
+                        if image_path and Path(image_path).exists():
+                            self._record_latency(provider, time.monotonic() - started)
+                            logger.info(f"Generated image: {image_path} (via {provider.__name__})")
+                            losers = [futures[f][0].__name__ for f in pending]
+                            if losers:
+                                logger.info(f"Abandoning slower providers for {slide_id}: {', '.join(losers)}")
+                            return image_path
+                    except Exception as e:
+                        last_err = e
+                        logger.warning(f"Image generation failed with {provider.__name__}: {e}")
+                if not self._hedge:
+                    while launch():
+                        pass
+                elif waiting and (newest not in pending or self._hedge_in(*futures[newest]) <= 0):
+                    hedged = launch()
+                    if hedged is not None:
+                        if len(pending) > 1:
+                            logger.info(f"Hedging slide {slide_id} with {futures[hedged][0].__name__}")
+                        newest = hedged
+        finally:
+            # Do not wait for the losers; still-running providers finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+            for fut in pending:
+                self._discard_result(fut)
+
+        raise RuntimeError(f"All image providers failed for slide {slide_id}: {last_err}")
+
+    # Providers billed to the same credential; racing them would pay that key twice per slide
+    _SHARED_CREDENTIALS = {
+        "_generate_with_dalle": "OPENAI_API_KEY",
+        "_generate_with_openai_rest": "OPENAI_API_KEY",
+    }
+
+    def _credential(self, provider) -> str:
+        """The API key a provider bills to (its own name when it has a key of its own)"""
+        return self._SHARED_CREDENTIALS.get(provider.__name__, provider.__name__)
+
+    def _next_launchable(self, waiting, running) -> Optional[Callable]:
+        """First waiting provider whose key is not already in use by a running provider"""
+        busy = {self._credential(p) for p in running}
+        return next((p for p in waiting if self._credential(p) not in busy), None)
+
+    def _record_latency(self, provider, seconds: float):
+        """Remember a successful call's latency (last 64 per provider) for the hedge delay"""
+        self._latencies.setdefault(provider.__name__, deque(maxlen=64)).append(seconds)
+
+    def _hedge_in(self, provider, started: float) -> float:
+        """
+        Seconds until the next provider should be hedged in behind `provider` (started at `started`)
+
+        The delay is the provider's p95 latency over its recent successes, or
+        IMAGE_PROVIDER_HEDGE_DELAY (default 20s) until 8 samples exist. Infinite
+        when not hedging (every provider is already running).
+        """
+        if not self._hedge:
+            return float("inf")
+        samples = sorted(self._latencies.get(provider.__name__, ()))
+        if len(samples) >= 8:
+            delay = samples[int(0.95 * (len(samples) - 1))]
+        else:
+            delay = float(os.getenv("IMAGE_PROVIDER_HEDGE_DELAY", "20"))
+        return max(0.0, started + delay - time.monotonic())
+
+    def generate_images_batch(self, prompts: List[str], slide_ids: List[str],
+                              style: str = "professional", max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Generate images for several slides concurrently
+
+        Each image is still one provider request (n=1): the image APIs return
+        variations of a single prompt for n>1, so distinct slide prompts cannot
+        share a request. Overlapping the requests amortizes round-trips instead.
+
+        Returns:
+            Image paths in the order of `prompts`; None where all providers failed
+        """
+        if not prompts:
+            return []
+        # REST providers configured: run all requests on one event loop and aiohttp session
+        if aiohttp is not None and self._has_async_provider():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self._generate_batch_async(prompts, slide_ids, style, max_workers))
+        results = self.generate_images([(p, sid, style) for p, sid in zip(prompts, slide_ids)], max_workers)
+        return [results[sid] for sid in slide_ids]
+
+    async def generate_images_batch_async(self, prompts: List[str], slide_ids: List[str],
+                                          style: str = "professional", max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Awaitable generate_images_batch for callers already on an event loop
+
+        generate_images_batch cannot start a loop of its own there and would block
+        the caller's loop on a thread pool; this fans out with asyncio.gather over
+        one aiohttp session instead (worker threads when aiohttp is missing).
+
+        Returns:
+            Image paths in the order of `prompts`; None where all providers failed
+        """
+        if not prompts:
+            return []
+        if aiohttp is not None:
+            return await self._generate_batch_async(prompts, slide_ids, style, max_workers)
+        return await asyncio.to_thread(self.generate_images_batch, prompts, slide_ids, style, max_workers)
+
+    def generate_images(self, jobs: List[Tuple[str, str, str]], max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """
+        Generate images for (prompt, slide_id, style) jobs on a thread pool
+
+        Jobs may mix styles. Results are collected as they complete.
+
+        Returns:
+            {slide_id: image path, or None where all providers failed}
+        """
+        results: Dict[str, Optional[str]] = {}
+        if not jobs:
+            return results
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            futures = {pool.submit(self.generate_image, prompt, slide_id, style): slide_id
+                       for prompt, slide_id, style in jobs}
+            for done, fut in enumerate(as_completed(futures), 1):
+                slide_id = futures[fut]
+                try:
+                    results[slide_id] = fut.result()
+                    logger.info(f"[ImageGen] batch {done}/{len(jobs)}: {slide_id} done")
+                except Exception as e:
+                    logger.error(f"Batch image generation failed for {slide_id}: {e}")
+                    results[slide_id] = None
+        return results
+
+    async def _generate_batch_async(self, prompts: List[str], slide_ids: List[str],
+                                    style: str, max_concurrency: int) -> List[Optional[str]]:
+        """Concurrent generate_image_async over one aiohttp session (failures become None)"""
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(prompt, slide_id, session):
+            async with sem:
+                try:
+                    return await self.generate_image_async(prompt, slide_id, style, session=session)
+                except Exception as e:
+                    logger.error(f"Batch image generation failed for {slide_id}: {e}")
+                    return None
+
+        connector = aiohttp.TCPConnector(limit=max_concurrency)
+        async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': 'paperauto/1.0'}) as session:
+            return list(await asyncio.gather(*(_one(p, s, session) for p, s in zip(prompts, slide_ids))))
+
+    def generate_images_dedup(self, items: List[Tuple[str, str]], style: str = "professional",
+                              max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Generate images for (prompt, slide_id) pairs, one provider call per unique prompt
+
+        Slides whose enhanced prompts are identical share a single generation;
+        every other slide in the group gets a hardlink (or copy) of that image
+        at output_dir/{slide_id}{suffix}.
+
+        Returns:
+            Image paths in the order of `items`; None where generation failed
+        """
+        groups: Dict[str, List[int]] = {}
+        for i, (prompt, _) in enumerate(items):
+            groups.setdefault(self._enhance_prompt(prompt, style), []).append(i)
+
+        leaders = [indices[0] for indices in groups.values()]
+        generated = self.generate_images_batch(
+            [items[i][0] for i in leaders], [items[i][1] for i in leaders], style, max_workers
+        )
+
+        results: List[Optional[str]] = [None] * len(items)
+        for indices, src in zip(groups.values(), generated):
+            results[indices[0]] = src
+            for i in indices[1:]:
+                if src is not None:
+                    results[i] = self._link_image(src, items[i][1])
+        if len(leaders) < len(items):
+            logger.info(f"Deduplicated {len(items)} image requests into {len(leaders)} generations")
+        return results
+
+    def generate_image_variants(self, prompt: str, slide_ids: List[str], style: str = "professional",
+                                max_workers: int = 8) -> List[Optional[str]]:
+        """
+        Distinct images of one prompt, one per slide
+
+        n>1 only yields variations of a single prompt, so this is where batching a
+        provider request pays off: DashScope returns up to 4 variations per call.
+        Slides a batch did not cover (or every slide, without DashScope) get their
+        own generation on a thread pool. Variants bypass the image cache, which
+        holds one image per prompt.
+
+        Returns:
+            Image paths in the order of `slide_ids`; None where generation failed
+        """
+        results: List[Optional[str]] = [None] * len(slide_ids)
+        if self.dashscope_key:
+            for start in range(0, len(slide_ids), _DASHSCOPE_MAX_N):
+                chunk = slide_ids[start:start + _DASHSCOPE_MAX_N]
+                for i, path in enumerate(self._generate_with_dashscope_n(prompt, chunk, style)):
+                    results[start + i] = self._normalize_image(path)
+
+        def _one(slide_id):
+            try:
+                return self._normalize_image(self._generate_uncached(prompt, slide_id, style))
+            except Exception as e:
+                logger.error(f"Image variant generation failed for {slide_id}: {e}")
+                return None
+
+        missing = [i for i, path in enumerate(results) if path is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+                for i, path in zip(missing, pool.map(_one, [slide_ids[i] for i in missing])):
+                    results[i] = path
+        return results
+
+    def _link_image(self, src: str, slide_id: str) -> Optional[str]:
+        """Hardlink (falling back to copy) an existing image to output_dir/{slide_id}{suffix}"""
+        dst = self.output_dir / f"{slide_id}{Path(src).suffix}"
+        try:
+            dst.unlink(missing_ok=True)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy(src, dst)
+            return str(dst)
+        except OSError as e:
+            logger.error(f"Failed to reuse image {src} for {slide_id}: {e}")
+            return None
+
     def _generate_with_dashscope(self, prompt: str, slide_id: str, style: str) -> Optional[str]:
         """Generate image using DashScope (Alibaba Cloud)"""
-        try:
-            import dashscope
-            from dashscope import ImageSynthesis
+        paths = self._generate_with_dashscope_n(prompt, [slide_id], style)
+        return paths[0] if paths else None
 
-            dashscope.api_key = self.dashscope_key
+    def _generate_with_dashscope_n(self, prompt: str, slide_ids: List[str], style: str) -> List[str]:
+        """One DashScope request for len(slide_ids) variations of a prompt (n <= _DASHSCOPE_MAX_N); [] on failure"""
+        try:
+            _, ImageSynthesis = _dashscope()
 
             enhanced_prompt = self._enhance_prompt(prompt, style)
             last_err = None
             for attempt in range(4):
                 try:
                     response = ImageSynthesis.call(
+                        api_key=self.dashscope_key,
                         model='wanx-v1',
                         prompt=enhanced_prompt,
-                        n=1,
-                        size='1024*1024'
+                        n=len(slide_ids),
+                        size=self._dashscope_size
                     )
                     if response.status_code == 200 and response.output and response.output.results:
-                        image_url = response.output.results[0].url
-                        image_path = self.output_dir / f"{slide_id}_dashscope.png"
-                        self._download_image(image_url, image_path)
-                        return str(image_path)
+                        paths = []
+                        for slide_id, result in zip(slide_ids, response.output.results):
+                            image_path = self.output_dir / f"{slide_id}_dashscope.png"
+                            self._download_image(result.url, image_path)
+                            paths.append(str(image_path))
+                        return paths
+                    if getattr(response, 'status_code', None) in (400, 401, 403):
+                        logger.error(f"DashScope image generation rejected {response.status_code}: "
+                                     f"{getattr(response, 'message', '')}")
+                        return []
                     raise RuntimeError(f"DashScope unexpected response: {getattr(response, 'status_code', '?')}")
                 except Exception as e:
                     last_err = e
                     msg = str(e)
                     # Retry on network/5xx/empty
+                    if isinstance(e, _ExpiredURLError):
+                        logger.error(f"[ImageGen] {e}; not retrying")
+                        break
                     if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] DashScope API call failed (attempt {attempt+1}/4): {msg[:200]}, retrying in {wait_seconds}s...")
+                        wait_seconds = _retry_delay(attempt, e)
+                        logger.warning(f"[ImageGen] DashScope API call failed (attempt {attempt+1}/4): {msg[:200]}, retrying in {wait_seconds:.1f}s...")
                         time.sleep(wait_seconds)
                     else:
                         logger.error(f"DashScope image generation failed (final): {msg}")
@@ -100,22 +1235,42 @@ class ImageGenerator:
         except Exception as e:
             logger.error(f"DashScope image generation failed: {e}")
 
+        return []
+
+    def _generate_with_diffusers(self, prompt: str, slide_id: str, style: str) -> Optional[str]:
+        """Generate image locally with a diffusers pipeline (IMAGE_LOCAL_MODEL)"""
+        try:
+            pipe = _diffusers_pipeline(self.local_model)
+            enhanced_prompt = self._enhance_prompt(prompt, style)
+            with _DIFFUSERS_LOCK:
+                image = pipe(
+                    enhanced_prompt,
+                    num_inference_steps=int(os.getenv("IMAGE_LOCAL_STEPS", "30")),
+                    # Diffusion models need sides divisible by 8
+                    height=self.image_size[1] // 8 * 8,
+                    width=self.image_size[0] // 8 * 8,
+                ).images[0]
+            image_path = self.output_dir / f"{slide_id}_local.png"
+            image.save(image_path, 'PNG', compress_level=1)
+            return str(image_path)
+        except Exception as e:
+            logger.error(f"Local diffusers image generation failed: {e}")
         return None
 
     def _generate_with_dalle(self, prompt: str, slide_id: str, style: str) -> Optional[str]:
         """Generate image using DALL-E (OpenAI SDK)"""
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.openai_key)
+            client = _openai_client(self.openai_key)
+            model = os.getenv("OPENAI_IMAGE_MODEL", "dall-e-3")
             enhanced_prompt = self._enhance_prompt(prompt, style)
             last_err = None
             for attempt in range(4):
                 try:
                     response = client.images.generate(
-                        model=os.getenv("OPENAI_IMAGE_MODEL", "dall-e-3"),
+                        model=model,
                         prompt=enhanced_prompt,
-                        size=os.getenv("OPENAI_IMAGE_SIZE", "1024x1024"),
-                        quality="standard",
+                        size=self._openai_size_for(model),
+                        quality=self._openai_quality,
                         n=1,
                     )
                     image_url = response.data[0].url
@@ -124,9 +1279,15 @@ class ImageGenerator:
                     return str(image_path)
                 except Exception as e:
                     last_err = e
+                    if getattr(e, "status_code", None) in (400, 401, 403, 404):
+                        logger.error(f"DALL-E image generation rejected: {e}")
+                        break
+                    if isinstance(e, _ExpiredURLError):
+                        logger.error(f"[ImageGen] {e}; not retrying")
+                        break
                     if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] DALL-E API call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds}s...")
+                        wait_seconds = _retry_delay(attempt, e)
+                        logger.warning(f"[ImageGen] DALL-E API call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds:.1f}s...")
                         time.sleep(wait_seconds)
                     else:
                         logger.error(f"DALL-E image generation failed (final): {e}")
@@ -138,29 +1299,27 @@ class ImageGenerator:
     def _generate_with_openai_rest(self, prompt: str, slide_id: str, style: str) -> Optional[str]:
         """Generate image using OpenAI Images API via REST to avoid SDK dependency."""
         try:
-            import json, urllib.request, urllib.error
             enhanced_prompt = self._enhance_prompt(prompt, style)
             base = os.getenv("OPENAI_BASE_URL", "https://api.openai.com").rstrip('/')
-            last_err = None
+            model = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1")
+            body = {
+                "model": model,
+                "prompt": enhanced_prompt,
+                "size": self._openai_size_for(model),
+                "n": 1
+            }
+            payload = _dumps(body)
+            headers = {"Authorization": f"Bearer {self.openai_key}", "Content-Type": "application/json"}
             for attempt in range(4):
                 try:
-                    req = urllib.request.Request(
-                        url=f"{base}/v1/images/generations",
-                        data=json.dumps({
-                            "model": os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1"),
-                            "prompt": enhanced_prompt,
-                            "size": os.getenv("OPENAI_IMAGE_SIZE", "1024x1024"),
-                            "n": 1
-                        }).encode("utf-8"),
-                        headers={
-                            "Content-Type": "application/json",
-                            "Authorization": f"Bearer {self.openai_key}",
-                        },
-                        method="POST",
-                    )
-                    with urllib.request.urlopen(req) as resp:
-                        obj = json.loads(resp.read().decode("utf-8", errors="ignore"))
-                    data = obj.get("data") or []
+                    resp = self._http.post(f"{base}/v1/images/generations", data=payload, headers=headers,
+                                           timeout=_GENERATION_TIMEOUT)
+                    if resp.status_code in (400, 401, 403, 404):
+                        logger.error(f"OpenAI Images REST failed {resp.status_code}: {resp.text[:300]}")
+                        return None
+                    if resp.status_code >= 400:
+                        raise _TransientHTTPError(f"HTTP {resp.status_code} {resp.text[:160]}", resp.headers)
+                    data = resp.json().get("data") or []
                     if isinstance(data, list) and data:
                         if data[0].get("url"):
                             image_url = data[0]["url"]
@@ -168,96 +1327,84 @@ class ImageGenerator:
                             self._download_image(image_url, image_path)
                             return str(image_path)
                         if data[0].get("b64_json"):
-                            import base64
                             image_path = self.output_dir / f"{slide_id}_openai.png"
                             with open(image_path, 'wb') as f:
                                 f.write(base64.b64decode(data[0]["b64_json"]))
                             return str(image_path)
                     raise RuntimeError("OpenAI Images REST returned empty data")
-                except urllib.error.HTTPError as e:
-                    code = getattr(e, 'code', 0)
-                    body = ""
-                    try:
-                        body = e.read().decode("utf-8", errors="ignore")
-                    except Exception:
-                        pass
-                    if code in (400, 401, 403, 404):
-                        logger.error(f"OpenAI Images REST failed {code}: {body[:300]}")
-                        return None
-                    if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] OpenAI Images REST call failed (attempt {attempt+1}/4): HTTP {code} {body[:160]}, retrying in {wait_seconds}s...")
-                        time.sleep(wait_seconds)
-                    else:
-                        last_err = e
-                        logger.error(f"OpenAI REST image generation failed (final {code}): {body[:300]}")
-                        break
-                except urllib.error.URLError as e:
-                    last_err = e
-                    if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] OpenAI Images REST call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds}s...")
-                        time.sleep(wait_seconds)
-                    else:
-                        logger.error(f"OpenAI REST image generation failed (final): {e}")
-                        break
                 except Exception as e:
-                    last_err = e
+                    if isinstance(e, _ExpiredURLError):
+                        logger.error(f"[ImageGen] {e}; not retrying")
+                        break
                     if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] OpenAI Images REST call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds}s...")
+                        wait_seconds = _retry_delay(attempt, e)
+                        logger.warning(f"[ImageGen] OpenAI Images REST call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds:.1f}s...")
                         time.sleep(wait_seconds)
                     else:
                         logger.error(f"OpenAI REST image generation failed (final): {e}")
-                        break
         except Exception as e:
             logger.error(f"OpenAI REST image generation failed: {e}")
         return None
 
+    def _openai_size_for(self, model: str) -> str:
+        """OPENAI_IMAGE_SIZE if set, else the image size mapped to what `model` accepts"""
+        if os.getenv("OPENAI_IMAGE_SIZE") or model not in _OPENAI_SIZES:
+            return self._openai_size
+        return "{}x{}".format(*_nearest_size(self.image_size, _OPENAI_SIZES[model]))
+
+    def _modelscope_body(self, model: str, enhanced_prompt: str) -> Dict[str, str]:
+        """ModelScope submit body; size is only sent when it differs from the service default"""
+        body = {"model": model, "prompt": enhanced_prompt}
+        if self.image_size != _DEFAULT_IMAGE_SIZE:
+            body["size"] = f"{self.image_size[0]}x{self.image_size[1]}"
+        return body
+
     def _generate_with_modelscope(self, prompt: str, slide_id: str, style: str) -> Optional[str]:
         """Generate image using ModelScope Images API (async mode with polling)."""
         try:
-            import json, requests, time
-            api_url = os.getenv("IMAGE_API_URL") or "https://api-inference.modelscope.cn/v1/images/generations"
-            api_key = os.getenv("IMAGE_API_KEY")
-            model = os.getenv("IMAGE_MODEL") or "Qwen/Qwen-Image"
-            if not (api_url and api_key and model):
+            if not self._modelscope_cfg:
                 return None
+            api_url, api_key, model = self._modelscope_cfg
             enhanced_prompt = self._enhance_prompt(prompt, style)
             base_url = api_url.split("/v1/")[0].rstrip('/') + '/'
+            # Build the request body and headers once; every retry reuses the same bytes
+            payload = _dumps(self._modelscope_body(model, enhanced_prompt))
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+                "X-ModelScope-Async-Mode": "true",
+            }
+            poll_headers = {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+                "X-ModelScope-Task-Type": "image_generation",
+            }
             last_err = None
             for attempt in range(4):
                 try:
-                    headers = {
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                        "X-ModelScope-Async-Mode": "true",
-                    }
-                    submit = requests.post(
+                    submit = self._http.post(
                         api_url,
                         headers=headers,
-                        data=json.dumps({
-                            "model": model,
-                            "prompt": enhanced_prompt
-                        }, ensure_ascii=False).encode('utf-8')
+                        data=payload,
+                        timeout=_HTTP_TIMEOUT,
                     )
                     # Retryable on 429/5xx
                     if submit.status_code in (429, 500, 502, 503, 504):
-                        raise RuntimeError(f"ModelScope submit HTTP {submit.status_code}: {submit.text[:160]}")
+                        raise _TransientHTTPError(f"ModelScope submit HTTP {submit.status_code}: {submit.text[:160]}",
+                                                  submit.headers)
                     submit.raise_for_status()
                     task_id = submit.json().get("task_id")
                     if not task_id:
                         raise RuntimeError(f"ModelScope submit missing task_id: {submit.text[:200]}")
-                    poll_headers = {
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                        "X-ModelScope-Task-Type": "image_generation",
-                    }
                     image_url = None
-                    for _ in range(18):
-                        r = requests.get(f"{base_url}v1/tasks/{task_id}", headers=poll_headers)
+                    # Poll with exponential backoff (0.5s, 1s, 2s, 4s, then every 5s) for up to 90s
+                    delay = 0.5
+                    deadline = time.monotonic() + 90
+                    while time.monotonic() < deadline:
+                        r = self._http.get(f"{base_url}v1/tasks/{task_id}", headers=poll_headers, timeout=_HTTP_TIMEOUT)
                         if r.status_code in (429, 500, 502, 503, 504):
-                            time.sleep(5)
+                            time.sleep(_poll_wait(delay, r.headers, deadline))
+                            delay = min(delay * 2, 5.0)
                             continue
                         r.raise_for_status()
                         data = r.json()
@@ -269,7 +1416,8 @@ class ImageGenerator:
                             break
                         if status == "FAILED":
                             raise RuntimeError(f"ModelScope task failed: {data}")
-                        time.sleep(5)
+                        time.sleep(_poll_wait(delay, r.headers, deadline))
+                        delay = min(delay * 2, 5.0)
                     if not image_url:
                         raise RuntimeError("ModelScope task did not succeed in time")
                     image_path = self.output_dir / f"{slide_id}_modelscope.jpg"
@@ -279,9 +1427,12 @@ class ImageGenerator:
                 except Exception as e:
                     last_err = e
                     msg = str(e)
+                    if isinstance(e, _ExpiredURLError):
+                        logger.error(f"[ImageGen] {e}; not retrying")
+                        break
                     if attempt < 3:
-                        wait_seconds = 2 ** (attempt + 1)
-                        logger.warning(f"[ImageGen] ModelScope API call failed (attempt {attempt+1}/4): {msg[:200]}, retrying in {wait_seconds}s...")
+                        wait_seconds = _retry_delay(attempt, e)
+                        logger.warning(f"[ImageGen] ModelScope API call failed (attempt {attempt+1}/4): {msg[:200]}, retrying in {wait_seconds:.1f}s...")
                         time.sleep(wait_seconds)
                     else:
                         logger.error(f"ModelScope image generation failed (final): {msg}")
@@ -290,35 +1441,145 @@ class ImageGenerator:
             logger.error(f"ModelScope image generation failed: {e}")
         return None
 
-    def _generate_placeholder(self, prompt: str, slide_id: str, style: str) -> str:
-        """Generate a simple placeholder image using PIL"""
-        try:
-            from PIL import Image, ImageDraw, ImageFont
-
-            # Create image
-            img = Image.new('RGB', (1024, 1024), color=(240, 240, 245))
-            draw = ImageDraw.Draw(img)
-
-            # Add text
+    async def _generate_with_modelscope_async(self, session, prompt: str, slide_id: str, style: str) -> Optional[str]:
+        """Generate image using ModelScope Images API on the event loop (aiohttp, same protocol as the sync path)."""
+        if not self._modelscope_cfg:
+            return None
+        api_url, api_key, model = self._modelscope_cfg
+        enhanced_prompt = self._enhance_prompt(prompt, style)
+        base_url = api_url.split("/v1/")[0].rstrip('/') + '/'
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "X-ModelScope-Async-Mode": "true",
+        }
+        poll_headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "X-ModelScope-Task-Type": "image_generation",
+        }
+        body = _dumps(self._modelscope_body(model, enhanced_prompt))
+        retryable = (429, 500, 502, 503, 504)
+        for attempt in range(4):
             try:
-                font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Arial.ttf", 40)
-            except:
-                font = ImageFont.load_default()
+                async with session.post(api_url, headers=headers, data=body) as submit:
+                    if submit.status in retryable:
+                        raise _TransientHTTPError(f"ModelScope submit HTTP {submit.status}: {(await submit.text())[:160]}",
+                                                  submit.headers)
+                    submit.raise_for_status()
+                    task_id = (await submit.json(content_type=None)).get("task_id")
+                if not task_id:
+                    raise RuntimeError("ModelScope submit missing task_id")
 
-            # Wrap text
-            text = f"Image: {prompt[:100]}"
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
+                image_url = None
+                # Poll with exponential backoff (0.5s, 1s, 2s, 4s, then every 5s) for up to 90s
+                delay = 0.5
+                deadline = time.monotonic() + 90
+                while time.monotonic() < deadline:
+                    async with session.get(f"{base_url}v1/tasks/{task_id}", headers=poll_headers) as r:
+                        data = None
+                        wait = _poll_wait(delay, r.headers, deadline)
+                        if r.status not in retryable:
+                            r.raise_for_status()
+                            data = await r.json(content_type=None)
+                    if data is not None:
+                        status = data.get("task_status")
+                        if status == "SUCCEED":
+                            outs = data.get("output_images") or []
+                            if outs:
+                                image_url = outs[0]
+                            break
+                        if status == "FAILED":
+                            raise RuntimeError(f"ModelScope task failed: {data}")
+                    await asyncio.sleep(wait)
+                    delay = min(delay * 2, 5.0)
+                if not image_url:
+                    raise RuntimeError("ModelScope task did not succeed in time")
 
-            x = (1024 - text_width) // 2
-            y = (1024 - text_height) // 2
+                image_path = self.output_dir / f"{slide_id}_modelscope.jpg"
+                await self._download_image_async(session, image_url, image_path)
+                return str(image_path)
+            except Exception as e:
+                if isinstance(e, _ExpiredURLError):
+                    logger.error(f"[ImageGen] {e}; not retrying")
+                    break
+                if attempt < 3:
+                    wait_seconds = _retry_delay(attempt, e)
+                    logger.warning(f"[ImageGen] ModelScope async call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds:.1f}s...")
+                    await asyncio.sleep(wait_seconds)
+                else:
+                    logger.error(f"ModelScope async image generation failed (final): {e}")
+        return None
 
-            draw.text((x, y), text, fill=(100, 100, 120), font=font)
+    async def _generate_with_openai_rest_async(self, session, prompt: str, slide_id: str, style: str) -> Optional[str]:
+        """Generate image using OpenAI Images API via REST on the event loop (aiohttp)."""
+        enhanced_prompt = self._enhance_prompt(prompt, style)
+        base = os.getenv("OPENAI_BASE_URL", "https://api.openai.com").rstrip('/')
+        model = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1")
+        body = {
+            "model": model,
+            "prompt": enhanced_prompt,
+            "size": self._openai_size_for(model),
+            "n": 1
+        }
+        payload = _dumps(body)
+        headers = {"Authorization": f"Bearer {self.openai_key}", "Content-Type": "application/json"}
+        timeout = aiohttp.ClientTimeout(sock_connect=_GENERATION_TIMEOUT[0], sock_read=_GENERATION_TIMEOUT[1])
+        for attempt in range(4):
+            try:
+                async with session.post(f"{base}/v1/images/generations", data=payload, headers=headers,
+                                        timeout=timeout) as resp:
+                    if resp.status in (400, 401, 403, 404):
+                        logger.error(f"OpenAI Images REST failed {resp.status}: {(await resp.text())[:300]}")
+                        return None
+                    if resp.status >= 400:
+                        raise _TransientHTTPError(f"HTTP {resp.status} {(await resp.text())[:160]}", resp.headers)
+                    data = (await resp.json(content_type=None)).get("data") or []
+                if isinstance(data, list) and data:
+                    image_path = self.output_dir / f"{slide_id}_openai.png"
+                    if data[0].get("url"):
+                        await self._download_image_async(session, data[0]["url"], image_path)
+                        return str(image_path)
+                    if data[0].get("b64_json"):
+                        with open(image_path, 'wb') as f:
+                            f.write(base64.b64decode(data[0]["b64_json"]))
+                        return str(image_path)
+                raise RuntimeError("OpenAI Images REST returned empty data")
+            except Exception as e:
+                if isinstance(e, _ExpiredURLError):
+                    logger.error(f"[ImageGen] {e}; not retrying")
+                    break
+                if attempt < 3:
+                    wait_seconds = _retry_delay(attempt, e)
+                    logger.warning(f"[ImageGen] OpenAI Images REST async call failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds:.1f}s...")
+                    await asyncio.sleep(wait_seconds)
+                else:
+                    logger.error(f"OpenAI REST async image generation failed (final): {e}")
+        return None
 
-            # Save
-            image_path = self.output_dir / f"{slide_id}_placeholder.png"
-            img.save(image_path)
+    async def _download_image_async(self, session, url: str, save_path: Path):
+        """Stream an image to disk on the event loop (64KB chunks via a .part file)"""
+        tmp_path = save_path.with_name(save_path.name + ".part")
+        try:
+            async with session.get(url) as r:
+                if r.status in _EXPIRED_URL_STATUS:
+                    raise _ExpiredURLError(f"Image URL expired (HTTP {r.status}): {url[:120]}")
+                r.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in r.content.iter_chunked(64 * 1024):
+                        f.write(chunk)
+            os.replace(tmp_path, save_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        logger.info(f"Downloaded image to {save_path}")
+
+    def _generate_placeholder(self, prompt: str, slide_id: str, style: str) -> str:
+        """Generate a simple placeholder image using PIL"""
+        try:
+            # Rendering is deterministic in (text, format): repeated prompts reuse the encoded bytes
+            image_path = self.output_dir / f"{slide_id}_placeholder.{self.image_format}"
+            image_path.write_bytes(_placeholder_bytes(f"Image: {prompt[:100]}", self.image_format))
 
             logger.info(f"Generated placeholder image: {image_path}")
             return str(image_path)
@@ -327,39 +1588,59 @@ class ImageGenerator:
             logger.error(f"Placeholder generation failed: {e}")
             return None
 
-    def _enhance_prompt(self, prompt: str, style: str) -> str:
-        """Enhance prompt with style keywords"""
-        style_keywords = {
-            'professional': 'professional, clean, modern, business style',
-            'academic': 'academic, scholarly, educational, diagram style',
-            'technical': 'technical, engineering, blueprint, schematic style',
-            'illustration': 'illustration, artistic, colorful, infographic style'
-        }
+    def _normalize_image(self, image_path: str) -> str:
+        """
+        Transcode a provider image to WebP when image_format is webp
 
-        keywords = style_keywords.get(style, style_keywords['professional'])
-        return f"{prompt}, {keywords}, high quality, detailed"
+        Provider PNG/JPEG files are several times larger than WebP at the same
+        visual quality, and every image ends up embedded in a slide. With
+        IMAGE_FORMAT=png, or on any transcode failure, the original is kept.
+        """
+        path = Path(image_path)
+        if self.image_format != "webp" or path.suffix.lower() == ".webp":
+            return image_path
+        try:
+            Image, _, _ = _pil()
+            webp_path = path.with_suffix('.webp')
+            with Image.open(path) as img:
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+                img.save(webp_path, 'WEBP', quality=_WEBP_QUALITY, method=4)
+            path.unlink()
+            return str(webp_path)
+        except Exception as e:
+            logger.warning(f"[ImageGen] WebP transcode failed for {path}: {e}")
+            return image_path
+
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _enhance_prompt(prompt: str, style: str) -> str:
+        """Enhance prompt with style keywords"""
+        return prompt + _STYLE_SUFFIX.get(style, _STYLE_SUFFIX['professional'])
 
     def _download_image(self, url: str, save_path: Path):
-        """Download image from URL with unified retries"""
-        last_err = None
-        for attempt in range(4):
-            try:
-                response = requests.get(url)
-                # Retryable status codes
-                if response.status_code in (429, 500, 502, 503, 504):
-                    raise RuntimeError(f"HTTP {response.status_code}")
+        """
+        Download image from URL (retries with backoff come from the session adapter)
+
+        A dead result URL (401/403/404/410) raises _ExpiredURLError straight from the
+        GET's status line, with no body read and no retry. No HEAD probe is sent first:
+        it would add a round trip to every successful download to save none on a dead one.
+        """
+        # Stream to disk in 64KB chunks instead of buffering the whole image; write to a
+        # sibling temp file first so a dropped connection never leaves a truncated image
+        tmp_path = Path(save_path).with_name(Path(save_path).name + ".part")
+        try:
+            with self._http.get(url, stream=True, timeout=_HTTP_TIMEOUT) as response:
+                if response.status_code in _EXPIRED_URL_STATUS:
+                    raise _ExpiredURLError(f"Image URL expired (HTTP {response.status_code}): {url[:120]}")
                 response.raise_for_status()
-                with open(save_path, 'wb') as f:
-                    f.write(response.content)
-                logger.info(f"Downloaded image to {save_path}")
-                return
-            except Exception as e:
-                last_err = e
-                if attempt < 3:
-                    wait_seconds = 2 ** (attempt + 1)
-                    logger.warning(f"[ImageGen] download failed (attempt {attempt+1}/4): {str(e)[:200]}, retrying in {wait_seconds}s...")
-                    time.sleep(wait_seconds)
-                else:
-                    logger.error(f"Image download failed (final): {e}")
-                    raise
+                response.raw.decode_content = True
+                with open(tmp_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=64 * 1024)
+            os.replace(tmp_path, save_path)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.error(f"Image download failed: {e}")
+            raise
+        logger.info(f"Downloaded image to {save_path}")
 